@@ -0,0 +1,210 @@
+"""Headless load and latency benchmark for the app.
+
+Each simulated session opens the app with ``streamlit.testing.v1.AppTest``,
+visits every sidebar section, reads every part of the story and submits
+the quiz. For every rerun it records the wall time and the serialized
+size of the elements on the page. Every worker process first runs one
+unmeasured session, whose first rerun is reported separately as the cold
+start, then the measured one, then ``LEAK_SESSIONS`` more to see how much
+the process RSS grows per session once everything shared is built.
+
+    python benchmarks/bench_app.py                      # one session at a time
+    python benchmarks/bench_app.py --sessions 8         # 8 concurrent sessions
+    python benchmarks/bench_app.py --app sevr_project/app.py
+    python benchmarks/bench_app.py --update-baseline    # store the results
+
+Results are compared with ``benchmarks/baseline.json``; the run fails if a
+metric is worse than its baseline by more than ``--tolerance``. Baselines
+are recorded with ``--repeat 20`` for one session and ``--repeat 10`` for
+more, so that p95 is not down to a handful of reruns.
+"""
+
+import argparse
+import gc
+import json
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+
+# Metrics where a larger number is a regression
+METRICS = ("cold_start_ms", "p50_ms", "p95_ms", "rss_growth_kb", "bytes_per_rerun")
+
+# Changes smaller than this are noise, whatever the baseline (RSS growth
+# per session is within a couple of MB of zero from one run to the next)
+NOISE = {"rss_growth_kb": 2 * 1024}
+
+
+# Sessions after the measured one over which the RSS growth is averaged
+LEAK_SESSIONS = 3
+
+
+def rss_kb():
+    """Current resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except OSError:
+        # Peak rather than current, but the best we have off Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def element_bytes(node):
+    """Serialized size of the elements under an AppTest tree node."""
+    children = getattr(node, "children", None)
+    if children is not None:
+        return sum(element_bytes(child) for child in children.values())
+    proto = getattr(node, "proto", None)
+    return proto.ByteSize() if proto is not None else 0
+
+
+class Session:
+    def __init__(self, app):
+        from streamlit.testing.v1 import AppTest
+
+        self.at = AppTest.from_file(str(app), default_timeout=60)
+        self.reruns = []  # (label, seconds, bytes)
+
+    def run(self, label, action=None):
+        if action is not None:
+            action()
+        start = time.perf_counter()
+        self.at.run()
+        elapsed = time.perf_counter() - start
+        if self.at.exception:
+            raise RuntimeError(f"{label}: {self.at.exception[0].value}")
+        self.reruns.append((label, elapsed, element_bytes(self.at._tree)))
+
+    def visit_everything(self):
+        at = self.at
+        self.run("start")
+        for section in at.sidebar.radio[0].options:
+            self.run(f"section:{section}", lambda: at.sidebar.radio[0].set_value(section))
+            if section == "Story of the Hijrah":
+                for part in at.main.radio[0].options:
+                    self.run(f"story:{part}", lambda: at.main.radio[0].set_value(part))
+            elif section == "Quiz":
+                for n in range(len(at.main.radio)):
+                    radio = at.main.radio[n]
+                    self.run(f"quiz:answer{n + 1}", lambda: radio.set_value(radio.options[-1]))
+                submit = next(b for b in at.main.button if "Submit" in b.label)
+                self.run("quiz:submit", submit.click)
+
+
+def run_session(app):
+    """One full session in this (worker) process; returns its measurements."""
+    app = Path(app).resolve()
+    # Run from the app's directory, as ``streamlit run`` would
+    os.chdir(app.parent)
+    sys.path.insert(0, str(app.parent))
+
+    # Pays for the imports and shared caches, which later sessions reuse
+    cold = Session(app)
+    cold.visit_everything()
+
+    session = Session(app)
+    session.visit_everything()
+    gc.collect()
+    before = rss_kb()
+    for _ in range(LEAK_SESSIONS):
+        Session(app).visit_everything()
+    gc.collect()
+    return {
+        "cold_start_s": cold.reruns[0][1],
+        "reruns": session.reruns,
+        "rss_growth_kb": (rss_kb() - before) // LEAK_SESSIONS,
+    }
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, round(pct / 100 * (len(values) - 1)))]
+
+
+def summarize(results):
+    times = [t for r in results for _, t, _ in r["reruns"]]
+    sizes = [b for r in results for _, _, b in r["reruns"]]
+    return {
+        "sessions": len(results),
+        "reruns": len(times),
+        "cold_start_ms": round(1000 * statistics.median(r["cold_start_s"] for r in results), 2),
+        "p50_ms": round(1000 * statistics.median(times), 2),
+        "p95_ms": round(1000 * percentile(times, 95), 2),
+        # A leak raises the median; a single worker's allocator can swing it
+        "rss_growth_kb": round(statistics.median(r["rss_growth_kb"] for r in results)),
+        "bytes_per_rerun": round(statistics.mean(sizes)),
+    }
+
+
+def slowest(results, count=5):
+    by_label = {}
+    for r in results:
+        for label, t, _ in r["reruns"]:
+            by_label.setdefault(label, []).append(t)
+    ranked = sorted(by_label.items(), key=lambda item: -statistics.median(item[1]))
+    return [(label, round(1000 * statistics.median(ts), 2)) for label, ts in ranked[:count]]
+
+
+def compare(summary, baseline, tolerance):
+    """One message per metric that regressed against ``baseline``."""
+    failures = []
+    for metric, limit in baseline.items():
+        if metric not in summary or summary[metric] - limit <= NOISE.get(metric, 0):
+            continue
+        if summary[metric] > limit * (1 + tolerance):
+            failures.append(f"{metric}: {summary[metric]} > {limit} (+{tolerance:.0%})")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--app", default="app.py", help="app script, relative to the repository root")
+    parser.add_argument("--sessions", type=int, default=1, help="sessions to run at the same time")
+    parser.add_argument("--repeat", type=int, default=3, help="rounds of --sessions sessions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed regression, as a fraction")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    app = (ROOT / args.app).resolve()
+    mode = f"{args.app}:sessions={args.sessions}"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Keep benchmark submissions out of the real database, and let every
+        # worker pick its own free port for the local server
+        os.environ["CAVE_DB_PATH"] = os.path.join(tmp, "quiz.sqlite3")
+        os.environ["CAVE_SERVER_PORT"] = "0"
+        results = []
+        # A fresh worker per session, so each one starts cold
+        with ProcessPoolExecutor(max_workers=args.sessions, max_tasks_per_child=1) as pool:
+            for _ in range(args.repeat):
+                results += pool.map(run_session, [app] * args.sessions)
+
+    summary = summarize(results)
+    print(f"{mode}: {json.dumps(summary)}")
+    print("slowest reruns (median ms):", slowest(results))
+
+    baselines = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    if args.update_baseline:
+        baselines[mode] = {metric: summary[metric] for metric in METRICS}
+        BASELINE_PATH.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"baseline for {mode} updated")
+        return 0
+
+    if mode not in baselines:
+        print(f"no baseline for {mode}; run with --update-baseline to store one")
+        return 0
+    failures = compare(summary, baselines[mode], args.tolerance)
+    for failure in failures:
+        print("REGRESSION", failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
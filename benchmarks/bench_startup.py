@@ -0,0 +1,149 @@
+"""Startup benchmark: import time and time to first render.
+
+Every round starts a fresh Python process, as after a deploy. In it, one
+session opens the app with ``streamlit.testing.v1.AppTest`` and a second
+session opens it right after, with the shared caches warm. Reported:
+
+* ``import_ms`` - time spent importing modules during the first run of
+  the app (measured with ``python -X importtime``; Streamlit itself is
+  imported beforehand and not counted)
+* ``first_render_ms`` - the first session's first run
+* ``second_render_ms`` - the second session's first run, once the
+  warm-up (``cave.warmup``) has finished
+
+It also lists the heavy libraries the first run imported, which should
+not include any that only one section needs. NumPy and Pillow are not
+checked: ``st.image`` imports both for the sidebar images on every page.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --app sevr_project/app.py
+    python benchmarks/bench_startup.py --update-baseline
+
+Results are compared with ``benchmarks/baseline.json`` like those of
+``bench_app.py``.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from bench_app import BASELINE_PATH, ROOT, compare
+
+METRICS = ("import_ms", "first_render_ms", "second_render_ms")
+
+HEAVY = ("pandas", "pyarrow", "pydeck")
+
+MARKER = "-- first run --"
+
+
+def child(app):
+    """Run in the fresh process: open the app twice and report the timings."""
+    from streamlit.testing.v1 import AppTest
+
+    os.chdir(app.parent)
+    sys.path.insert(0, str(app.parent))
+    loaded = set(sys.modules)
+    print(MARKER, file=sys.stderr, flush=True)
+
+    times = []
+    for _ in range(2):
+        # The second session measures warm caches: let the warm-up finish
+        for thread in threading.enumerate():
+            if thread.name == "cave-warmup":
+                thread.join()
+        at = AppTest.from_file(str(app), default_timeout=60)
+        start = time.perf_counter()
+        at.run()
+        times.append(time.perf_counter() - start)
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+        print(MARKER, file=sys.stderr, flush=True)
+    print(json.dumps({
+        "first_render_s": times[0],
+        "second_render_s": times[1],
+        "heavy": sorted(m for m in HEAVY if m in sys.modules and m not in loaded),
+    }))
+
+
+def import_seconds(stderr):
+    """Total time of the top-level imports logged during the first run."""
+    sections = stderr.split(MARKER)
+    total = 0
+    for line in sections[1].splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name[1:].startswith(" "):  # not nested in another import
+            total += int(cumulative)
+    return total / 1e6
+
+
+def run_round(app):
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, "CAVE_DB_PATH": os.path.join(tmp, "quiz.sqlite3"), "CAVE_SERVER_PORT": "0"}
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", __file__, "--child", str(app)],
+            env=env, capture_output=True, text=True, check=True,
+        )
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["import_s"] = import_seconds(proc.stderr)
+    return result
+
+
+def summarize(results):
+    def median_ms(key):
+        return round(1000 * statistics.median(r[key] for r in results), 2)
+
+    return {
+        "rounds": len(results),
+        "import_ms": median_ms("import_s"),
+        "first_render_ms": median_ms("first_render_s"),
+        "second_render_ms": median_ms("second_render_s"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--app", default="app.py", help="app script, relative to the repository root")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh processes to start")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed regression, as a fraction")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(Path(args.child))
+        return 0
+
+    app = (ROOT / args.app).resolve()
+    mode = f"{args.app}:startup"
+    results = [run_round(app) for _ in range(args.repeat)]
+    summary = summarize(results)
+    print(f"{mode}: {json.dumps(summary)}")
+    print("heavy imports in the first run:", results[0]["heavy"])
+
+    baselines = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    if args.update_baseline:
+        baselines[mode] = {metric: summary[metric] for metric in METRICS}
+        BASELINE_PATH.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"baseline for {mode} updated")
+        return 0
+
+    if mode not in baselines:
+        print(f"no baseline for {mode}; run with --update-baseline to store one")
+        return 0
+    failures = compare(summary, baselines[mode], args.tolerance)
+    for failure in failures:
+        print("REGRESSION", failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Shared code for the Cave of Thawr Streamlit app."""
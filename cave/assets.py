@@ -0,0 +1,78 @@
+"""Content-addressed store for the files browsers download.
+
+A file is stored once under ``.cache/assets/<sha256><suffix>``, whatever it
+was called and whichever edition asked for it, and served by the local
+server at ``/assets/<sha256><suffix>``. As the name changes whenever the
+bytes do, responses carry ``Cache-Control: immutable`` with a one year
+lifetime and the hash as a strong ETag: a returning visitor never
+downloads an unchanged image again, and a revalidation is an empty 304.
+
+The store is only used when ``CAVE_SERVER_URL`` gives the address
+browsers reach the server at, as ``cave.cluster`` does: a default of
+``http://localhost:<port>`` would break images for any visitor on another
+machine, or on an HTTPS page. Without it, or with ``CAVE_ASSET_SERVER=0``,
+images go through Streamlit's media endpoint as before.
+"""
+
+import hashlib
+import os
+import re
+import shutil
+from pathlib import Path
+
+import streamlit as st
+
+from cave import server
+
+STORE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "assets"
+
+ENABLED = bool(server.PUBLIC_URL) and os.environ.get("CAVE_ASSET_SERVER", "1") != "0"
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+CONTENT_TYPES = {
+    ".webp": "image/webp",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".css": "text/css; charset=utf-8",
+    ".woff2": "font/woff2",
+}
+
+NAME = re.compile(r"([0-9a-f]{64})(\.[a-z0-9]+)$")
+
+
+def put(path):
+    """Add the file at ``path`` to the store; returns its stored name."""
+    path = Path(path)
+    digest = hashlib.sha256(path.read_bytes()).hexdigest()
+    name = digest + path.suffix.lower()
+    target = STORE_DIR / name
+    if not target.exists():
+        STORE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(f".{os.getpid()}.tmp")
+        shutil.copyfile(path, tmp)
+        os.replace(tmp, target)
+    return name
+
+
+@st.cache_resource(show_spinner=False)
+def _publish(path, mtime_ns):
+    server.start()
+    return server.url(f"/assets/{put(path)}")
+
+
+def url(path):
+    """URL of the file at ``path``, served from the store."""
+    path = Path(path)
+    return _publish(str(path), path.stat().st_mtime_ns)
+
+
+@server.route("/assets/")
+def serve_asset(request, rest):
+    match = NAME.match(rest)
+    path = STORE_DIR / rest
+    if match is None or match.group(2) not in CONTENT_TYPES or not path.is_file():
+        request.send_error(404)
+        return
+    request.send_file(path, CONTENT_TYPES[match.group(2)], cache_control=IMMUTABLE, etag=f'"{match.group(1)}"')
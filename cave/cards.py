@@ -0,0 +1,102 @@
+"""HTML cards for Qur'an verses.
+
+The card template is compiled once at import, rendered cards are memoized
+per (verse id, locale) in a bounded LRU cache, and the shared CSS (with the
+Arabic font from ``cave.fonts``) is sent once per page by ``inject_css()``
+instead of once per card.
+"""
+
+import html
+from functools import lru_cache
+from string import Template
+
+import streamlit as st
+
+from cave import fonts, metrics
+from cave.content import load_bundle
+
+CSS = """
+<style>
+.ayet-card {
+    background-color: #f0f2f6;
+    padding: 20px;
+    border-radius: 10px;
+    box-shadow: 0px 4px 12px rgba(0,0,0,0.1);
+    animation: fadeIn 2s;
+    position: relative;
+    margin-bottom: 1rem;
+}
+.ayet-card h4 { margin-top: 0; }
+.ayet-card .arabic { font-size: 1.6em; line-height: 2.2; }
+@keyframes fadeIn {
+  0% { opacity: 0; }
+  100% { opacity: 1; }
+}
+</style>
+"""
+
+CARD = Template("""
+<div class="ayet-card">
+    <h4>🕌 $title</h4>
+    <b>Arabic:</b><br>
+    <div class="arabic" dir="rtl" lang="ar">$arabic</div><br>
+    $translations
+</div>
+""")
+
+TRANSLATION = Template("""<b>$label:</b><br>
+    "$text"<br><br>
+    """)
+
+# locale -> translations shown on the card, as (verse field, label)
+LOCALES = {
+    "all": (("tr", "Turkish Translation"), ("en", "English Translation")),
+    "tr": (("tr", "Turkish Translation"),),
+    "en": (("en", "English Translation"),),
+}
+
+PAGE_SIZE = 5
+
+
+@lru_cache(maxsize=512)
+def card_html(verse_id, locale="all"):
+    verse = load_bundle().verses_by_id[verse_id]
+    translations = "".join(
+        TRANSLATION.substitute(label=label, text=html.escape(getattr(verse, field)))
+        for field, label in LOCALES[locale]
+    )
+    return CARD.substitute(
+        title=html.escape(verse.title),
+        arabic=html.escape(verse.arabic),
+        translations=translations.rstrip(),
+    )
+
+
+metrics.register_cache("card_html", card_html)
+
+
+def inject_css():
+    """Send the card CSS and Arabic font; call once per page, before the cards."""
+    st.markdown(CSS + fonts.font_face(), unsafe_allow_html=True)
+
+
+def card(verse_id, locale="all"):
+    st.markdown(card_html(verse_id, locale), unsafe_allow_html=True)
+
+
+@metrics.timed("call_seconds", call="card_list")
+def card_list(verse_ids, locale="all", page_size=PAGE_SIZE, key="cards", footer=None):
+    """Show ``verse_ids`` a page at a time.
+
+    Only the cards on the current page are rendered. ``footer(verse_id)`` is
+    called under each card, e.g. for a copy button.
+    """
+    verse_ids = list(verse_ids)
+    pages = max(1, -(-len(verse_ids) // page_size))
+    page = 1
+    if pages > 1:
+        page = st.number_input(f"Page (1-{pages})", min_value=1, max_value=pages, step=1, key=f"{key}_page")
+    for verse_id in verse_ids[(page - 1) * page_size:page * page_size]:
+        card(verse_id, locale)
+        if footer is not None:
+            footer(verse_id)
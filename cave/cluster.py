@@ -0,0 +1,210 @@
+"""Run several Streamlit workers behind HAProxy.
+
+A Streamlit process is one Python interpreter, so it uses one core. For
+event days, run N of them behind a local reverse proxy::
+
+    python -m cave.cluster --workers 4 --port 8501
+    python -m cave.cluster --workers 4 --app sevr_project/app.py
+
+Worker ``i`` runs Streamlit on ``--base-port + i`` and its file server
+(``cave.server``: images, tiles, video) on ``--base-port + 100 + i``.
+HAProxy listens on ``--port``. It keeps each browser on one worker with a
+``cave_worker`` cookie, because a session's state lives in that worker's
+memory, and sends file requests to any worker. The workers share the quiz
+database, so quiz progress survives a worker going away (see
+``cave.quiz``).
+
+``kill -HUP <pid>`` restarts the workers one at a time. Each one is first
+set to drain in HAProxy: no new sessions, but its current sessions carry
+on. After ``--drain-seconds`` it is stopped, which flushes its queued
+writes, and started again. Visitors still on it reconnect to another
+worker and resume their quiz. ``Ctrl+C`` or ``kill <pid>`` stops
+everything.
+"""
+
+import argparse
+import os
+import secrets
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+from string import Template
+
+APP_DIR = Path(__file__).resolve().parent.parent
+RUN_DIR = APP_DIR / "data" / "cluster"
+
+HAPROXY_CFG = Template("""\
+global
+    stats socket $socket mode 600 level admin
+
+defaults
+    mode http
+    option redispatch
+    retries 3
+    timeout connect 5s
+    timeout client 1h
+    timeout server 1h
+    timeout tunnel 1h
+
+frontend cave
+    bind $bind
+    acl files path_beg /assets/ /tiles/ /video/
+    use_backend files if files
+    default_backend streamlit
+
+backend streamlit
+    balance leastconn
+    cookie cave_worker insert indirect nocache
+    option httpchk GET /_stcore/health
+$streamlit_servers
+
+backend files
+    balance roundrobin
+$file_servers
+""")
+
+
+class Cluster:
+    def __init__(self, app, workers, port, base_port, drain_seconds, public_url):
+        self.app = app
+        self.workers = workers
+        self.port = port
+        self.base_port = base_port
+        self.drain_seconds = drain_seconds
+        self.public_url = public_url or f"http://localhost:{port}"
+        # Shared by all workers, so their cookies stay valid after a redispatch
+        self.cookie_secret = secrets.token_hex(16)
+        self.socket = RUN_DIR / "haproxy.sock"
+        self.procs = {}
+        self.proxy = None
+        self.restart_requested = False
+
+    def worker_env(self, i):
+        env = dict(os.environ)
+        env.update({
+            "CAVE_SERVER_HOST": "127.0.0.1",
+            "CAVE_SERVER_PORT": str(self.base_port + 100 + i),
+            "CAVE_SERVER_URL": self.public_url,
+            "STREAMLIT_SERVER_COOKIE_SECRET": self.cookie_secret,
+        })
+        if os.environ.get("CAVE_METRICS_PORT"):
+            env["CAVE_METRICS_PORT"] = str(int(os.environ["CAVE_METRICS_PORT"]) + i)
+        return env
+
+    def start_worker(self, i):
+        self.procs[i] = subprocess.Popen([
+            sys.executable, "-m", "streamlit", "run", str(self.app),
+            "--server.port", str(self.base_port + i),
+            "--server.address", "127.0.0.1",
+            "--server.headless", "true",
+        ], cwd=APP_DIR, env=self.worker_env(i))
+        self.wait_healthy(i)
+
+    def wait_healthy(self, i, timeout=60):
+        url = f"http://127.0.0.1:{self.base_port + i}/_stcore/health"
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.procs[i].poll() is not None:
+                raise SystemExit(f"worker {i} exited with code {self.procs[i].returncode}")
+            try:
+                with urllib.request.urlopen(url, timeout=2):
+                    return
+            except OSError:
+                time.sleep(0.5)
+        raise SystemExit(f"worker {i} did not become healthy in {timeout} s")
+
+    def stop_worker(self, i, timeout=30):
+        # Streamlit shuts down cleanly on SIGTERM; atexit then flushes the
+        # quiz database writer
+        proc = self.procs.pop(i)
+        proc.terminate()
+        try:
+            proc.wait(timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+    def write_config(self):
+        RUN_DIR.mkdir(parents=True, exist_ok=True)
+        path = RUN_DIR / "haproxy.cfg"
+        path.write_text(HAPROXY_CFG.substitute(
+            socket=self.socket,
+            bind=f"*:{self.port}",
+            streamlit_servers="\n".join(
+                f"    server w{i} 127.0.0.1:{self.base_port + i} check cookie w{i}" for i in range(self.workers)),
+            file_servers="\n".join(
+                f"    server f{i} 127.0.0.1:{self.base_port + 100 + i} check" for i in range(self.workers)),
+        ))
+        return path
+
+    def admin(self, command):
+        """Send a command to HAProxy's runtime API."""
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.connect(str(self.socket))
+            s.sendall(command.encode() + b"\n")
+            return s.recv(65536).decode()
+
+    def rolling_restart(self):
+        for i in range(self.workers):
+            print(f"draining worker {i}")
+            self.admin(f"set server streamlit/w{i} state drain")
+            time.sleep(self.drain_seconds)
+            self.stop_worker(i)
+            self.start_worker(i)
+            self.admin(f"set server streamlit/w{i} state ready")
+            print(f"worker {i} restarted")
+
+    def run(self):
+        signal.signal(signal.SIGHUP, lambda *_: setattr(self, "restart_requested", True))
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        try:
+            # Build the image variants and other disk caches once, up front
+            subprocess.run([sys.executable, "-m", "cave.warmup"], cwd=APP_DIR, check=True,
+                           env={**os.environ, "CAVE_SERVER_PORT": "0"})
+            for i in range(self.workers):
+                self.start_worker(i)
+            self.proxy = subprocess.Popen(["haproxy", "-f", str(self.write_config())])
+            print(f"{self.workers} workers serving {self.app.name} at {self.public_url}")
+            while True:
+                if self.restart_requested:
+                    self.restart_requested = False
+                    self.rolling_restart()
+                for i, proc in list(self.procs.items()):
+                    if proc.poll() is not None:
+                        print(f"worker {i} exited with code {proc.returncode}; restarting")
+                        self.start_worker(i)
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        for i in list(self.procs):
+            self.stop_worker(i)
+        if self.proxy is not None:
+            self.proxy.terminate()
+            self.proxy.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run several Streamlit workers behind HAProxy.")
+    parser.add_argument("--app", default="app.py", help="app script, relative to the repository root")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--port", type=int, default=8501, help="port HAProxy listens on")
+    parser.add_argument("--base-port", type=int, default=8511, help="port of the first worker")
+    parser.add_argument("--drain-seconds", type=float, default=30,
+                        help="how long a worker drains before it is restarted")
+    parser.add_argument("--public-url", help="address browsers use to reach HAProxy "
+                                             "(default http://localhost:PORT)")
+    args = parser.parse_args()
+    Cluster(APP_DIR / args.app, args.workers, args.port, args.base_port,
+            args.drain_seconds, args.public_url).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""Page content (verses, story, timeline, quiz) loaded from ``content/bundle.json``.
+
+Editions of the app share all code and images and differ only in their
+bundle. ``CAVE_EDITION=sevr`` reads ``content/editions/sevr.json`` instead;
+a process serves one edition (command-line tools pick theirs with
+``use_edition()``).
+
+The bundle is validated and compiled into frozen objects once per process
+and shared read-only by every session through ``st.cache_resource``.
+"""
+
+import json
+import os
+import sys
+from dataclasses import MISSING, dataclass
+from functools import cached_property
+from pathlib import Path
+
+import streamlit as st
+
+CONTENT_DIR = Path(__file__).resolve().parent.parent / "content"
+
+
+def bundle_path(edition):
+    if edition == "default":
+        return CONTENT_DIR / "bundle.json"
+    return CONTENT_DIR / "editions" / f"{edition}.json"
+
+
+def editions():
+    """Names of the editions that have a bundle."""
+    return ["default"] + sorted(path.stem for path in (CONTENT_DIR / "editions").glob("*.json"))
+
+
+EDITION = os.environ.get("CAVE_EDITION", "default")
+BUNDLE_PATH = bundle_path(EDITION)
+
+# Bundle format versions this code can read
+SUPPORTED_VERSIONS = (1,)
+
+
+class BundleError(ValueError):
+    """The content bundle is missing a field or has the wrong shape."""
+
+
+@dataclass(frozen=True)
+class Verse:
+    id: str
+    title: str
+    arabic: str
+    tr: str
+    en: str
+
+
+@dataclass(frozen=True)
+class StoryPart:
+    title: str
+    text: str
+    image: str
+    caption: str
+
+
+@dataclass(frozen=True)
+class TimelineEvent:
+    year: int
+    event: str
+    month: int = 0  # 1-12, or 0 if only the year is known
+    end_year: int = 0  # for events that last; 0 means the event is a point in time
+    end_month: int = 0
+    category: str = ""
+    location: str = ""
+
+
+@dataclass(frozen=True)
+class Question:
+    id: str
+    question: str
+    options: tuple
+    answer: str
+    explanation: str = ""
+
+
+@dataclass(frozen=True)
+class Bundle:
+    version: int
+    verses: tuple
+    introduction: str
+    story: tuple
+    timeline: tuple
+    quiz_size: int
+    quiz: tuple
+    reflection: str
+
+    # Derived once per process, like the rest of the bundle
+    @cached_property
+    def verses_by_id(self):
+        return {verse.id: verse for verse in self.verses}
+
+    @cached_property
+    def story_titles(self):
+        return tuple(part.title for part in self.story)
+
+
+def _field(obj, key, kind, where):
+    if key not in obj:
+        raise BundleError(f"{where}: missing '{key}'")
+    value = obj[key]
+    if not isinstance(value, kind):
+        raise BundleError(f"{where}: '{key}' should be {kind.__name__}, got {type(value).__name__}")
+    return value
+
+
+def _items(raw, key, cls, where="bundle"):
+    items = []
+    for n, obj in enumerate(_field(raw, key, list, where)):
+        item_where = f"{key}[{n}]"
+        if not isinstance(obj, dict):
+            raise BundleError(f"{item_where}: should be an object")
+        unknown = set(obj) - set(cls.__dataclass_fields__)
+        if unknown:
+            raise BundleError(f"{item_where}: unknown field(s) {sorted(unknown)}")
+        kwargs = {}
+        for name, spec in cls.__dataclass_fields__.items():
+            if name not in obj and spec.default is not MISSING:
+                continue  # optional field, keep the default
+            if spec.type is tuple:
+                kwargs[name] = tuple(_field(obj, name, list, item_where))
+            else:
+                kwargs[name] = _field(obj, name, spec.type, item_where)
+        items.append(cls(**kwargs))
+    return tuple(items)
+
+
+def compile_bundle(raw):
+    """Validate a decoded bundle and turn it into a frozen ``Bundle``."""
+    if not isinstance(raw, dict):
+        raise BundleError("bundle: should be an object")
+    version = _field(raw, "version", int, "bundle")
+    if version not in SUPPORTED_VERSIONS:
+        raise BundleError(f"bundle: unsupported version {version}")
+
+    bundle = Bundle(
+        version=version,
+        verses=_items(raw, "verses", Verse),
+        introduction=_field(raw, "introduction", str, "bundle"),
+        story=_items(raw, "story", StoryPart),
+        timeline=_items(raw, "timeline", TimelineEvent),
+        quiz_size=_field(raw, "quiz_size", int, "bundle"),
+        quiz=_items(raw, "quiz", Question),
+        reflection=_field(raw, "reflection", str, "bundle"),
+    )
+
+    for kind, items in (("verse", bundle.verses), ("question", bundle.quiz)):
+        ids = [item.id for item in items]
+        if len(ids) != len(set(ids)):
+            raise BundleError(f"bundle: duplicate {kind} ids")
+    if not 0 < bundle.quiz_size <= len(bundle.quiz):
+        raise BundleError("bundle: quiz_size must be between 1 and the number of questions")
+    for question in bundle.quiz:
+        if question.answer not in question.options:
+            raise BundleError(f"quiz '{question.id}': answer is not one of the options")
+    for n, event in enumerate(bundle.timeline):
+        if not (0 <= event.month <= 12 and 0 <= event.end_month <= 12):
+            raise BundleError(f"timeline[{n}]: month should be between 0 and 12 (0 = unknown)")
+        if event.end_year and (event.end_year, event.end_month) < (event.year, event.month):
+            raise BundleError(f"timeline[{n}]: ends before it starts")
+    return bundle
+
+
+def read_bundle(path=None):
+    with open(path or BUNDLE_PATH, encoding="utf-8") as f:
+        return compile_bundle(json.load(f))
+
+
+@st.cache_resource(show_spinner=False)
+def load_bundle():
+    """The compiled bundle, shared by every session in this process."""
+    return read_bundle()
+
+
+def use_edition(edition):
+    """Make this process use ``edition``, dropping what was built from the previous one."""
+    global EDITION, BUNDLE_PATH
+    EDITION, BUNDLE_PATH = edition, bundle_path(edition)
+    load_bundle.clear()
+    # Caches derived from the bundle, in the modules that have been imported
+    # (importing them here would be circular)
+    modules = sys.modules
+    if "cave.cards" in modules:
+        modules["cave.cards"].card_html.cache_clear()
+    if "cave.search" in modules:
+        modules["cave.search"].verse_index.clear()
+    if "cave.timeline" in modules:
+        modules["cave.timeline"].load_timeline.clear()
+    if "cave.quiz" in modules:
+        modules["cave.quiz"].load_bank.clear()
@@ -0,0 +1,187 @@
+"""Export the read-only sections as static HTML for a CDN.
+
+Home, the four parts of the story, the timeline and the reflection are
+pure content, so they can be served as plain files. The quiz and the map
+stay on the Streamlit server; the exported pages link to it.
+
+    python -m cave.export --app-url https://quiz.example.org/
+    python -m cave.export --edition sevr --app-url https://sevr.example.org/
+
+Every edition is exported, each to ``dist/<edition>``, unless ``--edition``
+picks one content bundle; ``--out`` then gives another directory for it.
+
+Images and the stylesheet are written to ``assets/`` under names that
+contain their content hash, so they can be cached forever.
+"""
+
+import argparse
+import hashlib
+import html
+import re
+import shutil
+from pathlib import Path
+from string import Template
+
+from cave import cards, content, fonts, media, timeline
+from cave.content import load_bundle
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+VIDEO_ID = "bCD9-_y84Zk"
+
+BASE_CSS = """
+body { font-family: "Source Sans Pro", sans-serif; margin: 0; color: #31333f; }
+nav { background: #f0f2f6; padding: 1rem; }
+nav a { margin-right: 1rem; color: #31333f; text-decoration: none; }
+nav a.current { font-weight: bold; }
+main { max-width: 960px; margin: auto; padding: 1rem; }
+img { max-width: 100%; height: auto; }
+figcaption { color: #808495; font-size: 0.9em; }
+.video { position: relative; padding-bottom: 56.25%; height: 0; }
+.video iframe { position: absolute; width: 100%; height: 100%; border: 0; }
+"""
+
+PAGE = Template("""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>$title - Cave of Thawr</title>
+<link rel="stylesheet" href="$root$stylesheet">
+</head>
+<body>
+<nav>$nav</nav>
+<main>
+$body
+<hr>
+<p><b>Developed with ❤️ using <a href="https://streamlit.io/">Streamlit</a></b></p>
+</main>
+</body>
+</html>
+""")
+
+FIGURE = Template("""<figure><img src="$src" alt="$caption" width="$width" height="$height" loading="lazy">
+<figcaption>$caption</figcaption></figure>""")
+
+
+def slug(text):
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+def paragraphs(text):
+    """Plain text with blank-line separated paragraphs, as HTML."""
+    return "\n".join(f"<p>{html.escape(' '.join(p.split()))}</p>" for p in text.split("\n\n") if p.strip())
+
+
+class Exporter:
+    def __init__(self, out, app_url):
+        self.out = Path(out)
+        self.app_url = app_url
+        self.assets = {}
+        self.stylesheet = None
+
+    def asset(self, data, name):
+        """Write ``data`` to assets/ under a hashed name; returns the path."""
+        stem, ext = name.rsplit(".", 1)
+        path = f"assets/{stem}.{hashlib.sha256(data).hexdigest()[:12]}.{ext}"
+        if path not in self.assets:
+            target = self.out / path
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(data)
+            self.assets[path] = len(data)
+        return path
+
+    def figure(self, name, caption, root):
+        from PIL import Image
+
+        source = media.IMAGES_DIR / name
+        with Image.open(source) as im:
+            width = media.pick_width("main", im.width)
+        variant = media.build_variant(source, width)
+        with Image.open(variant) as im:
+            size = im.size
+        src = self.asset(variant.read_bytes(), variant.name.split(".")[0] + ".webp")
+        return FIGURE.substitute(src=root + src, caption=html.escape(caption), width=size[0], height=size[1])
+
+    def page(self, path, title, body):
+        root = "../" * path.count("/")
+        links = [("index.html", "Home"), ("story/" + slug(load_bundle().story[0].title) + ".html", "Story of the Hijrah"),
+                 ("timeline.html", "Hijrah Timeline"), ("reflection.html", "Reflection")]
+        nav = "".join(
+            f'<a href="{root}{href}"{" class=current" if title == label else ""}>{label}</a>' for href, label in links
+        )
+        nav += (f'<a href="{html.escape(self.app_url)}">Location of the Cave</a>'
+                f'<a href="{html.escape(self.app_url)}">Quiz</a>')
+        target = self.out / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(PAGE.substitute(title=html.escape(title), root=root, stylesheet=self.stylesheet,
+                                          nav=nav, body=body), encoding="utf-8")
+
+    def export(self):
+        bundle = load_bundle()
+        css = BASE_CSS + re.sub(r"</?style>", "", cards.CSS)
+        font = fonts.arabic_font()
+        if font is not None:
+            # Relative to the stylesheet, which is in assets/ too
+            url = self.asset(font.read_bytes(), "arabic.woff2").split("/", 1)[1]
+            css += re.sub(r"</?style>", "", fonts.FONT_FACE.substitute(
+                family=fonts.FAMILY, url=url, unicode_range=fonts.UNICODE_RANGE))
+        self.stylesheet = self.asset(css.encode(), "style.css")
+
+        self.page("index.html", "Home", "\n".join([
+            "<h1>🕌 Cave of Thawr - The Migration Story</h1>",
+            f'<div class="video"><iframe loading="lazy" src="https://www.youtube-nocookie.com/embed/{VIDEO_ID}" '
+            'allowfullscreen title="Our skit"></iframe></div>',
+            "<h2>📜 Selected Qur'an Verses about the Hijrah</h2>",
+            *(cards.card_html(verse.id) for verse in bundle.verses),
+            self.figure("sevr_cave.jpg", "Cave of Thawr - Present Day", ""),
+            "<h2>Introduction</h2>",
+            paragraphs(bundle.introduction),
+        ]))
+
+        titles = bundle.story_titles
+        for part in bundle.story:
+            parts_nav = " · ".join(
+                html.escape(t) if t == part.title else f'<a href="{slug(t)}.html">{html.escape(t)}</a>' for t in titles
+            )
+            self.page(f"story/{slug(part.title)}.html", "Story of the Hijrah", "\n".join([
+                "<h1>📖 The Story Unfolds</h1>",
+                f"<p>{parts_nav}</p>",
+                f"<h3>{html.escape(part.title)}</h3>",
+                paragraphs(part.text),
+                self.figure(part.image, part.caption, "../"),
+            ]))
+
+        items = "".join(f"<li><b>{timeline.label(e)}</b> - {html.escape(e.event)}</li>" for e in bundle.timeline)
+        self.page("timeline.html", "Hijrah Timeline", f"<h1>🕰️ Hijrah Timeline</h1>\n<ul>{items}</ul>")
+        self.page("reflection.html", "Reflection", f"<h1>🧠 Reflection</h1>\n{paragraphs(bundle.reflection)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the read-only sections as static HTML.")
+    parser.add_argument("--edition", choices=content.editions(), help="content bundle to export (default: all)")
+    parser.add_argument("--out", help="output directory, replaced (default: dist/<edition>)")
+    parser.add_argument("--app-url", default="http://localhost:8501/",
+                        help="where the Streamlit app (quiz, map) is served")
+    args = parser.parse_args()
+    if args.out and not args.edition:
+        parser.error("--out needs --edition")
+
+    editions = [args.edition] if args.edition else content.editions()
+    outs = {edition: Path(args.out or APP_DIR / "dist" / edition) for edition in editions}
+    for out in outs.values():
+        if out.exists() and any(out.iterdir()) and not (out / "index.html").exists():
+            parser.error(f"{out} is not empty and does not look like an earlier export")
+
+    for edition, out in outs.items():
+        content.use_edition(edition)
+        if out.exists():
+            shutil.rmtree(out)
+        exporter = Exporter(out, args.app_url)
+        exporter.export()
+        pages = sorted(str(p.relative_to(out)) for p in out.rglob("*.html"))
+        print(f"{edition}: {len(pages)} pages and {len(exporter.assets)} assets written to {out}")
+
+
+if __name__ == "__main__":
+    main()
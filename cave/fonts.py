@@ -0,0 +1,178 @@
+"""Self-hosted Arabic font, cut down to the characters the content uses.
+
+The verse cards set their Arabic text in Amiri, a Naskh typeface made for
+the Qur'an. The full font is several hundred KB, but the cards only use
+a few dozen letters and marks, so the build keeps just those (and every
+glyph the Arabic shaping rules can turn them into) and writes a WOFF2 of
+a few dozen KB under ``.cache/fonts``. It is served from the asset store
+with ``font-display: swap``: the text shows in a system font straight
+away and switches once the font has arrived, which is then cached for
+good. Without the asset store (see ``cave.assets``) the subset is
+embedded in the page as a data URI instead, so it is sent again on every
+page the cards are on.
+
+The subset is named after a hash of the source font and the characters,
+so it is rebuilt only when the content uses a new character. That happens
+on first use if fontTools is installed (``pip install fonttools brotli``)
+and the source font is present, or ahead of time with::
+
+    python -m cave.fonts            # downloads Amiri once, then subsets it
+
+Without a built subset, the cards fall back to the fonts the visitor
+has.
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import urllib.request
+from pathlib import Path
+from string import Template
+
+import streamlit as st
+
+from cave import assets
+
+APP_DIR = Path(__file__).resolve().parent.parent
+CONTENT_DIR = APP_DIR / "content"
+SOURCE_PATH = APP_DIR / "data" / "fonts" / "Amiri-Regular.ttf"
+SOURCE_URL = "https://github.com/google/fonts/raw/main/ofl/amiri/Amiri-Regular.ttf"
+CACHE_DIR = APP_DIR / ".cache" / "fonts"
+
+FAMILY = "Cave Arabic"
+
+# Arabic, Arabic Supplement, Arabic Extended-A and the presentation forms
+ARABIC_RANGES = ((0x0600, 0x06FF), (0x0750, 0x077F), (0x08A0, 0x08FF), (0xFB50, 0xFDFF), (0xFE70, 0xFEFF))
+UNICODE_RANGE = ", ".join(f"U+{lo:04X}-{hi:04X}" for lo, hi in ARABIC_RANGES)
+
+# Changing how subsets are made must not reuse older ones
+SUBSET_VERSION = 1
+
+FONT_FACE = Template("""
+<style>
+@font-face {
+    font-family: "$family";
+    src: url($url) format("woff2");
+    font-display: swap;
+    unicode-range: $unicode_range;
+}
+.ayet-card .arabic { font-family: "$family", "Amiri", "Noto Naskh Arabic", serif; }
+</style>
+""")
+
+
+def is_arabic(char):
+    return any(lo <= ord(char) <= hi for lo, hi in ARABIC_RANGES)
+
+
+def _strings(value):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+
+
+def charset(content_dir=CONTENT_DIR):
+    """Every character of every Arabic string in the content bundles.
+
+    All editions are scanned, so they share one font file.
+    """
+    chars = set()
+    for path in sorted(content_dir.rglob("*.json")):
+        with open(path, encoding="utf-8") as f:
+            for text in _strings(json.load(f)):
+                if any(is_arabic(c) for c in text):
+                    chars.update(text)
+    return "".join(sorted(chars))
+
+
+def subset_path(chars, source=SOURCE_PATH):
+    key = hashlib.sha256(source.read_bytes() + chars.encode() + bytes([SUBSET_VERSION])).hexdigest()[:16]
+    return CACHE_DIR / f"{source.stem}.{key}.woff2"
+
+
+def build(chars, source=SOURCE_PATH):
+    """Write the WOFF2 subset of ``source`` for ``chars`` if it is not cached yet."""
+    target = subset_path(chars, source)
+    if target.exists():
+        return target
+
+    from fontTools import subset
+
+    options = subset.Options()
+    options.flavor = "woff2"
+    # Keep every OpenType feature: Arabic needs its joining forms, ligatures
+    # and mark positioning to be shaped at all
+    options.layout_features = ["*"]
+    options.hinting = False
+    options.name_IDs = ["*"]  # keeps the copyright and licence (OFL) entries
+    font = subset.load_font(str(source), options)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(text=chars)
+    subsetter.subset(font)
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_suffix(f".{os.getpid()}.tmp")
+    subset.save_font(font, str(tmp), options)
+    os.replace(tmp, target)
+    return target
+
+
+@st.cache_resource(show_spinner=False)
+def arabic_font():
+    """Path of the subset for the current content, or None if it can't be had."""
+    chars = charset()
+    if not SOURCE_PATH.exists():
+        return None
+    target = subset_path(chars)
+    if target.exists():
+        return target
+    try:
+        return build(chars)
+    except ImportError:
+        return None
+
+
+@st.cache_resource(show_spinner=False)
+def _data_uri(path):
+    return "data:font/woff2;base64," + base64.b64encode(path.read_bytes()).decode()
+
+
+def font_face():
+    """``<style>`` declaring the Arabic font, or "" without it."""
+    path = arabic_font()
+    if path is None:
+        return ""
+    url = assets.url(path) if assets.ENABLED else _data_uri(path)
+    return FONT_FACE.substitute(family=FAMILY, url=url, unicode_range=UNICODE_RANGE)
+
+
+def download(url=SOURCE_URL):
+    SOURCE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    request = urllib.request.Request(url, headers={"User-Agent": "cave-of-thawr"})
+    with urllib.request.urlopen(request, timeout=60) as response:
+        SOURCE_PATH.write_bytes(response.read())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the subsetted Arabic web font.")
+    parser.add_argument("--url", default=SOURCE_URL, help="where to download the source font from")
+    args = parser.parse_args()
+
+    if not SOURCE_PATH.exists():
+        download(args.url)
+    chars = charset()
+    target = build(chars)
+    arabic = sum(is_arabic(c) for c in chars)
+    print(f"{len(chars)} characters ({arabic} Arabic): {SOURCE_PATH.stat().st_size // 1024} KB "
+          f"-> {target.name} ({target.stat().st_size // 1024} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""Downscaled WebP variants of the images in ``images/``.
+
+Variants are written to ``.cache/images`` under a name that includes the
+content hash of the source file, so an edited image never reuses a stale
+variant. Next to them sits a tiny placeholder of each image (a few
+hundred bytes, embedded in the page as a data URI) that is shown, blurred
+by upscaling, until the real picture has arrived. All of these are
+generated on first use, or ahead of time with::
+
+    python -m cave.media
+"""
+
+import base64
+import hashlib
+import html
+import logging
+import os
+from pathlib import Path
+from string import Template
+
+import streamlit as st
+
+from cave import assets, metrics, server
+
+APP_DIR = Path(__file__).resolve().parent.parent
+IMAGES_DIR = APP_DIR / "images"
+CACHE_DIR = APP_DIR / ".cache" / "images"
+
+# Widths generated for every image
+WIDTHS = (320, 640, 960, 1280)
+
+# Pixel width needed by each place an image is shown (about twice the CSS
+# width, so high-DPI phones still get a sharp picture)
+SLOTS = {
+    "sidebar": 640,
+    "main": 1280,
+}
+
+WEBP_QUALITY = 80
+
+# Width of the placeholders, in pixels
+PLACEHOLDER_WIDTH = 24
+
+FIGURE = Template("""<figure style="margin: 0 0 1rem 0">
+<img src="$src" alt="$alt" width="$width" height="$height" style="width: 100%; height: auto;
+ border-radius: 0.5rem; background: url($placeholder) center / cover no-repeat">
+<figcaption style="text-align: center; font-size: 14px; color: rgba(49, 51, 63, 0.6)">$caption</figcaption>
+</figure>$prefetch""")
+
+# Loads an image into the browser cache without showing it
+PREFETCH = Template("""<img src="$src" alt="" width="1" height="1" fetchpriority="low"
+ style="position: absolute; opacity: 0; pointer-events: none">""")
+
+
+def content_hash(path):
+    """Short SHA-256 of a file's bytes."""
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()[:16]
+
+
+def variant_path(source, width):
+    """Where the ``width`` px WebP variant of ``source`` is cached."""
+    source = Path(source)
+    return CACHE_DIR / f"{source.stem}.{content_hash(source)}.{width}.webp"
+
+
+def build_variant(source, width):
+    """Write the WebP variant of ``source`` if it is not cached yet."""
+    from PIL import Image
+
+    target = variant_path(source, width)
+    cached = target.exists()
+    metrics.cache_result("image_variant", cached)
+    if cached:
+        return target
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with Image.open(source) as im:
+        # PNGs here are line art (the QR code), which must stay crisp
+        lossless = im.format == "PNG"
+        im = im.convert("RGBA" if im.mode in ("RGBA", "LA", "P") else "RGB")
+        if im.width > width:
+            im.thumbnail((width, im.height), Image.LANCZOS)
+        tmp = target.with_suffix(f".{os.getpid()}.tmp")
+        im.save(tmp, "WEBP", quality=WEBP_QUALITY, lossless=lossless, method=6)
+    os.replace(tmp, target)
+    return target
+
+
+def build_placeholder(source):
+    """Write the tiny placeholder of ``source`` if it is not cached yet."""
+    from PIL import Image
+
+    source = Path(source)
+    target = CACHE_DIR / f"{source.stem}.{content_hash(source)}.placeholder.webp"
+    if target.exists():
+        return target
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with Image.open(source) as im:
+        im = im.convert("RGB")
+        im.thumbnail((PLACEHOLDER_WIDTH, PLACEHOLDER_WIDTH * im.height // im.width + 1), Image.LANCZOS)
+        tmp = target.with_suffix(f".{os.getpid()}.tmp")
+        im.save(tmp, "WEBP", quality=40)
+    os.replace(tmp, target)
+    return target
+
+
+def widths_for(source_width):
+    """Generated widths that differ for an image ``source_width`` px wide.
+
+    Anything wider than the source would just be a copy of it, so only the
+    first such width is kept.
+    """
+    widths = [w for w in WIDTHS if w < source_width]
+    bigger = [w for w in WIDTHS if w >= source_width]
+    return widths + bigger[:1]
+
+
+def pick_width(slot, source_width):
+    """Smallest generated width that fills ``slot`` without upscaling."""
+    wanted = min(SLOTS[slot], source_width)
+    for width in widths_for(source_width):
+        if width >= wanted:
+            return width
+    return WIDTHS[-1]
+
+
+@st.cache_resource(show_spinner=False)
+def _variant(source, mtime_ns, slot):
+    from PIL import Image
+
+    with Image.open(source) as im:
+        source_width = im.width
+    return str(build_variant(source, pick_width(slot, source_width)))
+
+
+def variant(name, slot="main"):
+    """Path of the variant of ``images/<name>`` to show in ``slot``.
+
+    Falls back to the original file if the variant cannot be built.
+    """
+    source = IMAGES_DIR / name
+    try:
+        return _variant(str(source), source.stat().st_mtime_ns, slot)
+    except (ImportError, OSError):
+        return str(source)
+
+
+@st.cache_resource(show_spinner=False)
+def _read(path):
+    return Path(path).read_bytes()
+
+
+def source(name, slot="main"):
+    """What ``st.image`` is given for ``images/<name>`` in ``slot``.
+
+    The URL of the variant in the asset store (cached by browsers for
+    good), or its bytes, kept in memory, if the asset server is turned off.
+    """
+    path = variant(name, slot)
+    return assets.url(path) if assets.ENABLED else _read(path)
+
+
+def image(name, caption=None, slot="main", container=st):
+    """``st.image`` for ``images/<name>``, sized for ``slot``."""
+    with metrics.timed("call_seconds", call="st.image"):
+        container.image(source(name, slot), caption=caption, width="stretch")
+
+
+@st.cache_resource(show_spinner=False)
+def _placeholder(source, mtime_ns):
+    data = build_placeholder(source).read_bytes()
+    return "data:image/webp;base64," + base64.b64encode(data).decode()
+
+
+def placeholder(name):
+    """Data URI of the placeholder of ``images/<name>``."""
+    source = IMAGES_DIR / name
+    return _placeholder(str(source), source.stat().st_mtime_ns)
+
+
+@st.cache_resource(show_spinner=False)
+def _warn_without_server():
+    # Logged once per process, as the fallback is otherwise easy to miss
+    if not server.PUBLIC_URL:
+        logging.getLogger(__name__).warning(
+            "CAVE_SERVER_URL is not set: story pictures are shown without placeholders or prefetching")
+
+
+@st.cache_resource(show_spinner=False)
+def _size(path):
+    from PIL import Image
+
+    with Image.open(path) as im:
+        return im.size
+
+
+def figure(name, caption="", slot="main", prefetch=(), container=st):
+    """Like ``image()``, but shows the placeholder until the picture loads.
+
+    The images named in ``prefetch`` are fetched in the background, so they
+    are already in the browser cache when they are shown. This needs the
+    asset server; without it, this is ``image()`` (and a warning is logged
+    unless the server was turned off with ``CAVE_ASSET_SERVER=0``).
+    """
+    if not assets.ENABLED:
+        _warn_without_server()
+        image(name, caption, slot, container)
+        return
+    path = variant(name, slot)
+    width, height = _size(path)
+    with metrics.timed("call_seconds", call="figure"):
+        container.markdown(FIGURE.substitute(
+            src=assets.url(path),
+            alt=html.escape(caption),
+            width=width,
+            height=height,
+            placeholder=placeholder(name),
+            caption=html.escape(caption),
+            prefetch="".join(PREFETCH.substitute(src=source(other, slot)) for other in prefetch),
+        ), unsafe_allow_html=True)
+
+
+def main():
+    from PIL import Image
+
+    for source in sorted(IMAGES_DIR.iterdir()):
+        if source.suffix.lower() not in (".jpg", ".jpeg", ".png"):
+            continue
+        with Image.open(source) as im:
+            source_width = im.width
+        for width in widths_for(source_width):
+            target = build_variant(source, width)
+            print(f"{source.name} -> {target.name} ({target.stat().st_size // 1024} KB)")
+        target = build_placeholder(source)
+        print(f"{source.name} -> {target.name} ({target.stat().st_size} bytes)")
+
+
+if __name__ == "__main__":
+    main()
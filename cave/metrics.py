@@ -0,0 +1,237 @@
+"""In-process timers, counters and a Prometheus text endpoint.
+
+Off by default. Set ``CAVE_METRICS=1`` to collect metrics and show the
+"Diagnostics" section, and ``CAVE_METRICS_PORT`` to also serve them at
+``http://<host>:<port>/metrics``.
+
+When metrics are off, ``timed()`` returns a shared no-op object: used as a
+decorator it hands back the function unchanged, used as a ``with`` block it
+does nothing, and ``count()`` returns straight away.
+"""
+
+import errno
+import functools
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+ENABLED = os.environ.get("CAVE_METRICS", "") == "1"
+PORT = int(os.environ.get("CAVE_METRICS_PORT", "0"))
+
+# Histogram bucket upper bounds, in seconds
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, float("inf"))
+
+# A session counts as active if it reran within this many seconds
+SESSION_WINDOW = 300
+
+_lock = threading.Lock()
+_histograms = {}  # (name, labels) -> [bucket counts..., sum]
+_counters = {}  # (name, labels) -> value
+_sessions = {}  # session id -> last seen
+_caches = {}  # name -> functools.lru_cache wrapped function
+
+HELP = {
+    "section_render_seconds": "Time to render a section (full or fragment rerun).",
+    "call_seconds": "Time spent in an expensive call.",
+    "cache_requests_total": "Cache lookups, by result.",
+    "active_sessions": f"Sessions that reran in the last {SESSION_WINDOW} seconds.",
+}
+
+
+def _key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def observe(name, seconds, **labels):
+    key = (name, _key(labels))
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = [0] * len(BUCKETS) + [0.0]
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                hist[i] += 1
+                break
+        hist[-1] += seconds
+
+
+class _Timer:
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __call__(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # A fresh timer per call, so concurrent sessions don't share a start
+            with _Timer(self.name, self.labels):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class _NoTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __call__(self, func):
+        return func
+
+
+_NO_TIMER = _NoTimer()
+
+
+def timed(name, **labels):
+    """Time a ``with`` block or every call of a decorated function."""
+    if not ENABLED:
+        return _NO_TIMER
+    return _Timer(name, labels)
+
+
+def section(name):
+    """Decorate a section's ``render()``: time it and mark the session active.
+
+    Inside the fragment, so reruns of the section alone count as activity.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            touch_session()
+            with timed("section_render_seconds", section=name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def count(name, amount=1, **labels):
+    if not ENABLED:
+        return
+    key = (name, _key(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def cache_result(cache, hit):
+    count("cache_requests_total", cache=cache, result="hit" if hit else "miss")
+
+
+def register_cache(name, func):
+    """Report the hit/miss counts of an ``lru_cache`` function."""
+    _caches[name] = func
+
+
+def touch_session():
+    """Mark the current session as active; ``section()`` calls it on every run."""
+    if not ENABLED:
+        return
+    ctx = get_script_run_ctx()
+    if ctx is not None:
+        with _lock:
+            _sessions[ctx.session_id] = time.monotonic()
+
+
+def active_sessions():
+    cutoff = time.monotonic() - SESSION_WINDOW
+    with _lock:
+        for session_id in [s for s, seen in _sessions.items() if seen < cutoff]:
+            del _sessions[session_id]
+        return len(_sessions)
+
+
+def _labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+def snapshot():
+    """Copies of the histograms and counters, including the LRU caches."""
+    with _lock:
+        histograms = {key: list(value) for key, value in _histograms.items()}
+        counters = dict(_counters)
+    for name, func in _caches.items():
+        info = func.cache_info()
+        counters[("cache_requests_total", (("cache", name), ("result", "hit")))] = info.hits
+        counters[("cache_requests_total", (("cache", name), ("result", "miss")))] = info.misses
+    return histograms, counters
+
+
+def prometheus_text():
+    histograms, counters = snapshot()
+    lines = []
+    seen = set()
+
+    def header(name, kind):
+        if name not in seen:
+            seen.add(name)
+            lines.append(f"# HELP cave_{name} {HELP.get(name, name)}")
+            lines.append(f"# TYPE cave_{name} {kind}")
+
+    for (name, labels), hist in sorted(histograms.items()):
+        header(name, "histogram")
+        cumulative = 0
+        for bound, n in zip(BUCKETS, hist):
+            cumulative += n
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f"cave_{name}_bucket{_labels(labels, le=le)} {cumulative}")
+        lines.append(f"cave_{name}_sum{_labels(labels)} {hist[-1]}")
+        lines.append(f"cave_{name}_count{_labels(labels)} {cumulative}")
+    for (name, labels), value in sorted(counters.items()):
+        header(name, "counter")
+        lines.append(f"cave_{name}{_labels(labels)} {value}")
+    header("active_sessions", "gauge")
+    lines.append(f"cave_active_sessions {active_sessions()}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = prometheus_text().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@st.cache_resource(show_spinner=False)
+def _serve():
+    try:
+        server = ThreadingHTTPServer(("0.0.0.0", PORT), MetricsHandler)
+    except OSError as e:
+        if e.errno != errno.EADDRINUSE:
+            raise
+        # Each worker needs its own port (cave.cluster hands them out)
+        logging.getLogger(__name__).warning("metrics port %s is in use; not serving /metrics", PORT)
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+
+def start_server():
+    """Serve /metrics on ``CAVE_METRICS_PORT``, once per process."""
+    if ENABLED and PORT:
+        _serve()
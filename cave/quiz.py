@@ -0,0 +1,169 @@
+"""Quiz engine.
+
+The questions in the content bundle are compiled once into a
+``QuestionBank`` holding the answer key as a NumPy array. Each session draws
+its own seeded sample of questions, keeps its picks in an array that widget
+callbacks update one entry at a time, and is scored with a single array
+comparison.
+
+Every change is also saved to the shared database under a resume token
+that is kept in the page URL (``?quiz=...``). If the worker serving a
+session is restarted, the browser reconnects to another one, which finds
+the token in the URL and carries on with the same questions and answers.
+
+The token is all it takes to carry on a quiz, so the URL must not be
+shared once a quiz has started. A session only takes over a saved quiz
+that is not submitted yet and that no other open session owns; otherwise
+it starts a quiz of its own under a new token.
+"""
+
+import hashlib
+import secrets
+import time
+
+import numpy as np
+import streamlit as st
+from streamlit import runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from cave import submissions
+from cave.content import load_bundle
+
+# Query parameter holding the resume token
+TOKEN_PARAM = "quiz"
+
+# How long a session waits for a worker that is stopping to give up a quiz
+RELEASE_WAIT = 3
+
+
+class QuestionBank:
+    def __init__(self, questions):
+        self.questions = questions
+        self.ids = tuple(q.id for q in questions)
+        self.answer_key = np.array([q.options.index(q.answer) for q in questions], dtype=np.int16)
+        # Changes whenever questions are added, removed or reordered
+        self.fingerprint = hashlib.sha256("\n".join(self.ids).encode()).hexdigest()[:16]
+
+    def __len__(self):
+        return len(self.questions)
+
+    def sample(self, size, seed):
+        """Indices of ``size`` distinct questions, in bank order."""
+        rng = np.random.default_rng(seed)
+        size = min(size, len(self))
+        return np.sort(rng.choice(len(self), size=size, replace=False))
+
+    def score(self, picks, answers):
+        """Score answer indices ``answers`` to the questions at ``picks``.
+
+        Returns the number of correct answers and the per-question mask.
+        """
+        correct = answers == self.answer_key[picks]
+        return int(correct.sum()), correct
+
+
+@st.cache_resource(show_spinner=False)
+def load_bank():
+    return QuestionBank(load_bundle().quiz)
+
+
+def _seed():
+    # ?seed=123 in the URL gives a reproducible quiz (handy for a class)
+    seed = st.query_params.get("seed")
+    if seed is not None and seed.isdigit():
+        return int(seed)
+    return secrets.randbits(32)
+
+
+def _owner():
+    return f"{submissions.PROCESS}/{get_script_run_ctx().session_id}"
+
+
+def _in_use(saved):
+    """Whether a session other than this one has the saved quiz open."""
+    if not saved["owner"] or saved["owner"] == _owner():
+        return False
+    process, _, session_id = saved["owner"].rpartition("/")
+    if process == submissions.PROCESS:
+        return runtime.exists() and runtime.get_instance().is_active_session(session_id)
+    return time.time() - saved["updated_at"] < submissions.OWNER_TTL
+
+
+def save():
+    """Save this session's quiz under its resume token."""
+    state = st.session_state
+    submissions.save_progress(state.quiz_token, _owner(), state.quiz_bank, state.quiz_seed,
+                              state.quiz_answers, state.quiz_submitted)
+
+
+def start(size, seed=None):
+    """Draw a new set of questions for this session."""
+    bank = load_bank()
+    state = st.session_state
+    state.quiz_seed = _seed() if seed is None else seed
+    state.quiz_bank = bank.fingerprint
+    state.quiz_picks = bank.sample(size, state.quiz_seed)
+    # Radios start on their first option, so every answer starts at 0
+    state.quiz_answers = np.zeros(len(state.quiz_picks), dtype=np.int16)
+    state.quiz_submitted = False
+    if "quiz_token" not in state:
+        state.quiz_token = secrets.token_urlsafe(12)
+        st.query_params[TOKEN_PARAM] = state.quiz_token
+    save()
+
+
+def new_questions(size):
+    """Draw a different set of questions, dropping the answers to the current one."""
+    bank = load_bank()
+    state = st.session_state
+    if state.get("quiz_bank") == bank.fingerprint:
+        # The radios keep their choice under their key; they must start over
+        for i in state.quiz_picks:
+            state.pop(widget_key(bank.questions[i]), None)
+    # A fresh seed, even if the URL asks for a fixed one
+    start(size, seed=secrets.randbits(32))
+
+
+def resume():
+    """Restore the quiz saved under the URL's resume token; returns success."""
+    token = st.query_params.get(TOKEN_PARAM)
+    saved = submissions.load_progress(token) if token else None
+    bank = load_bank()
+    if saved is None or saved["bank"] != bank.fingerprint or saved["submitted"]:
+        return False
+    # A browser reconnecting after its worker stopped can get here before
+    # that worker has given up its quizzes, so wait a little for it
+    deadline = time.monotonic() + RELEASE_WAIT
+    while saved is not None and _in_use(saved) and time.monotonic() < deadline:
+        time.sleep(0.25)
+        saved = submissions.load_progress(token)
+    if saved is None or _in_use(saved) or not submissions.claim_progress(token, saved["owner"], _owner()):
+        return False
+    state = st.session_state
+    state.quiz_token = token
+    state.quiz_seed = saved["seed"]
+    state.quiz_bank = bank.fingerprint
+    state.quiz_answers = np.array(saved["answers"], dtype=np.int16)
+    state.quiz_picks = bank.sample(len(state.quiz_answers), state.quiz_seed)
+    state.quiz_submitted = saved["submitted"]
+    return True
+
+
+def session_quiz(size):
+    """This session's ``(bank, picks, answers)``, resuming or drawing them if needed."""
+    bank = load_bank()
+    state = st.session_state
+    if state.get("quiz_bank") != bank.fingerprint and not resume():
+        start(size)
+    return bank, state.quiz_picks, state.quiz_answers
+
+
+def widget_key(question):
+    return f"q_{question.id}"
+
+
+def record_answer(slot, question):
+    """Widget callback: store the answer to the question at ``slot``."""
+    choice = st.session_state[widget_key(question)]
+    st.session_state.quiz_answers[slot] = question.options.index(choice)
+    save()
@@ -0,0 +1,130 @@
+"""The Hijrah route (Mecca -> Cave of Thawr -> Medina) for the Location map.
+
+The stops come from ``content/route.csv``. A detailed GPS track can be put
+in ``content/route_track.csv`` (``latitude,longitude`` per line); without
+one the path just joins the stops.
+
+Coordinates are kept as float32 NumPy arrays. The track is simplified
+once with Douglas-Peucker for a few zoom levels, and the result is cached
+in ``.cache`` under the content hash of the CSV files, so only the level of
+detail the map needs is ever turned into JSON.
+"""
+
+import hashlib
+from pathlib import Path
+
+import numpy as np
+import streamlit as st
+
+APP_DIR = Path(__file__).resolve().parent.parent
+STOPS_PATH = APP_DIR / "content" / "route.csv"
+TRACK_PATH = APP_DIR / "content" / "route_track.csv"
+CACHE_DIR = APP_DIR / ".cache"
+
+# Zoom levels with their own simplified track
+LOD_ZOOMS = (4, 7, 10, 13)
+
+
+def douglas_peucker(points, tolerance):
+    """Indices of the points kept when simplifying ``points`` (n x 2)."""
+    n = len(points)
+    if n < 3:
+        return np.arange(n)
+    keep = np.zeros(n, dtype=bool)
+    keep[[0, -1]] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        a, b = points[start], points[end]
+        seg = b - a
+        inner = points[start + 1:end] - a
+        length = np.hypot(*seg)
+        if length == 0:
+            dist = np.hypot(inner[:, 0], inner[:, 1])
+        else:
+            dist = np.abs(seg[0] * inner[:, 1] - seg[1] * inner[:, 0]) / length
+        i = int(dist.argmax())
+        if dist[i] > tolerance:
+            mid = start + 1 + i
+            keep[mid] = True
+            stack.append((start, mid))
+            stack.append((mid, end))
+    return keep.nonzero()[0]
+
+
+def tolerance_for(zoom):
+    """About one screen pixel, in degrees of longitude, at ``zoom``."""
+    return 360 / (512 * 2 ** zoom)
+
+
+def _read_csv(path):
+    """Rows of a CSV file, without comments and the header line."""
+    with open(path, encoding="utf-8") as f:
+        rows = [line.rstrip("\n").split(",") for line in f if line.strip() and not line.startswith("#")]
+    return rows[1:]
+
+
+def _coords(rows):
+    """latitude/longitude (the last two columns) as an n x 2 array."""
+    return np.array([row[-2:] for row in rows], dtype=np.float64).reshape(-1, 2)
+
+
+def _source_hash():
+    digest = hashlib.sha256()
+    for path in (STOPS_PATH, TRACK_PATH):
+        if path.exists():
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def build():
+    """Compile the CSV files into ``.cache/route.<hash>.npz``."""
+    target = CACHE_DIR / f"route.{_source_hash()}.npz"
+    if target.exists():
+        return target
+
+    rows = _read_csv(STOPS_PATH)
+    names = [row[0] for row in rows]
+    stops = _coords(rows)
+    track = _coords(_read_csv(TRACK_PATH)) if TRACK_PATH.exists() else stops
+
+    # Work in lon/lat order (what deck.gl expects), scaling longitude so a
+    # tolerance means the same distance in both directions
+    lonlat = track[:, ::-1]
+    scaled = lonlat * [np.cos(np.radians(lonlat[:, 1].mean())), 1]
+    lods = {f"lod_{z}": douglas_peucker(scaled, tolerance_for(z)).astype(np.uint32) for z in LOD_ZOOMS}
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_suffix(".tmp.npz")
+    np.savez(tmp, names=np.array(names), stops=stops[:, ::-1].astype(np.float32),
+             track=lonlat.astype(np.float32), **lods)
+    tmp.replace(target)
+    return target
+
+
+class Route:
+    def __init__(self, path):
+        with np.load(path) as data:
+            self.names = tuple(data["names"].tolist())
+            self.stops = data["stops"]
+            self.track = data["track"]
+            self.lods = {z: data[f"lod_{z}"] for z in LOD_ZOOMS}
+
+    def path(self, zoom):
+        """Track coordinates simplified for ``zoom``, as a list for pydeck."""
+        level = max([z for z in LOD_ZOOMS if z <= zoom], default=LOD_ZOOMS[0])
+        return self.track[self.lods[level]].tolist()
+
+    def stop_rows(self):
+        return [{"name": name, "position": pos} for name, pos in zip(self.names, self.stops.tolist())]
+
+
+@st.cache_resource(show_spinner=False)
+def load_route():
+    return Route(build())
+
+
+if __name__ == "__main__":
+    print(build())
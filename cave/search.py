@@ -0,0 +1,106 @@
+"""Full-text search over the verses, in Arabic, Turkish and English.
+
+An inverted index from normalized words to verse ids is built once per
+process. Arabic is normalized by dropping harakat, Qur'anic annotation
+marks and tatweel and by unifying alef forms, so ``الله`` finds ``ٱللَّهُ``.
+Turkish and English are case folded with the Turkish dotted/dotless i rules
+and stripped of diacritics, so ``kusattik`` finds ``kuşattık``.
+
+Every query word is matched as a prefix of indexed words (found with a
+binary search over the sorted vocabulary), and a verse must match all of
+them.
+"""
+
+import re
+import unicodedata
+from bisect import bisect_left
+
+import streamlit as st
+
+from cave.content import load_bundle
+
+# Harakat, Qur'anic annotation marks (small high letters, pause marks, ...)
+# and tatweel
+ARABIC_MARKS = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]")
+ARABIC_LETTERS = str.maketrans({
+    "\u0622": "\u0627",  # alef with madda -> alef
+    "\u0623": "\u0627",  # alef with hamza above -> alef
+    "\u0625": "\u0627",  # alef with hamza below -> alef
+    "\u0671": "\u0627",  # alef wasla -> alef
+    "\u0649": "\u064a",  # alef maksura -> yeh
+    "\u0629": "\u0647",  # teh marbuta -> heh
+})
+# Conjunctions and the article glued to the front of Arabic words
+ARABIC_PREFIXES = ("وال", "فال", "ال", "و", "ف")
+
+WORD = re.compile(r"\w+")
+
+
+def normalize_arabic(text):
+    return ARABIC_MARKS.sub("", text).translate(ARABIC_LETTERS)
+
+
+def fold_latin(text):
+    # Turkish capitals first: I is the capital of ı, İ the capital of i
+    text = text.replace("I", "ı").replace("İ", "i").lower()
+    text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+    return text.replace("ı", "i")
+
+
+def normalize(text):
+    return fold_latin(normalize_arabic(text))
+
+
+def words(text):
+    return WORD.findall(normalize(text))
+
+
+def _forms(word):
+    """The word plus its Arabic forms without a glued-on prefix."""
+    yield word
+    for prefix in ARABIC_PREFIXES:
+        if word.startswith(prefix) and len(word) - len(prefix) >= 2:
+            yield word[len(prefix):]
+
+
+class SearchIndex:
+    def __init__(self, documents):
+        """``documents`` is an iterable of ``(doc_id, text)``."""
+        postings = {}
+        self.doc_ids = []
+        for doc_id, text in documents:
+            self.doc_ids.append(doc_id)
+            for word in words(text):
+                for form in _forms(word):
+                    postings.setdefault(form, set()).add(doc_id)
+        self.postings = {word: frozenset(ids) for word, ids in postings.items()}
+        self.vocabulary = sorted(self.postings)
+
+    def _prefix_matches(self, prefix):
+        matches = set()
+        for i in range(bisect_left(self.vocabulary, prefix), len(self.vocabulary)):
+            word = self.vocabulary[i]
+            if not word.startswith(prefix):
+                break
+            matches |= self.postings[word]
+        return matches
+
+    def search(self, query):
+        """Ids of documents containing every word of ``query``, in order."""
+        result = None
+        for word in words(query):
+            matches = self._prefix_matches(word)
+            result = matches if result is None else result & matches
+            if not result:
+                return []
+        if result is None:
+            return []
+        return [doc_id for doc_id in self.doc_ids if doc_id in result]
+
+
+@st.cache_resource(show_spinner=False)
+def verse_index():
+    return SearchIndex(
+        (verse.id, " ".join((verse.title, verse.arabic, verse.tr, verse.en)))
+        for verse in load_bundle().verses
+    )
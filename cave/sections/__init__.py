@@ -0,0 +1,19 @@
+"""One module per sidebar section.
+
+Every module exposes a ``render()`` function wrapped in ``st.fragment`` so
+clicking a widget inside a section only reruns that section. ``app.py``
+imports the module the first time its section is selected.
+"""
+
+# Sidebar label -> module name under cave.sections
+SECTIONS = {
+    "Home": "home",
+    "Location of the Cave": "location",
+    "Story of the Hijrah": "story",
+    "Hijrah Timeline": "timeline",
+    "Quiz": "quiz",
+    "Reflection": "reflection",
+}
+
+# Only listed when metrics are enabled (CAVE_METRICS=1)
+DIAGNOSTICS = {"Diagnostics": "diagnostics"}
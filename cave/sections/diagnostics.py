@@ -0,0 +1,43 @@
+"""Diagnostics: the runtime metrics, shown only when CAVE_METRICS=1."""
+
+import streamlit as st
+
+from cave import metrics
+
+
+@st.fragment
+@metrics.section("diagnostics")
+def render():
+    st.title("🩺 Diagnostics")
+
+    histograms, counters = metrics.snapshot()
+    st.metric("Active sessions", metrics.active_sessions())
+
+    rows = []
+    for (name, labels), hist in sorted(histograms.items()):
+        calls = sum(hist[:-1])
+        rows.append({
+            "metric": name,
+            "labels": ", ".join(f"{k}={v}" for k, v in labels),
+            "calls": calls,
+            "mean ms": round(1000 * hist[-1] / calls, 2) if calls else 0,
+        })
+    st.subheader("Timings")
+    st.dataframe(rows, hide_index=True, width="stretch")
+
+    caches = {}
+    for (name, labels), value in counters.items():
+        labels = dict(labels)
+        if name == "cache_requests_total":
+            caches.setdefault(labels["cache"], {"hit": 0, "miss": 0})[labels["result"]] = value
+    st.subheader("Caches")
+    st.dataframe(
+        [{"cache": cache, **counts, "hit ratio": round(counts["hit"] / max(1, counts["hit"] + counts["miss"]), 3)}
+         for cache, counts in sorted(caches.items())],
+        hide_index=True, width="stretch",
+    )
+
+    with st.expander("Prometheus text"):
+        st.code(metrics.prometheus_text(), language="text")
+    if st.button("🔄 Refresh"):
+        st.rerun(scope="fragment")
@@ -0,0 +1,46 @@
+"""Home: the skit video, the ayet cards and the introduction."""
+
+import streamlit as st
+
+from cave import cards, media, metrics, search, video
+from cave.content import load_bundle
+
+TRANSLATIONS = {"Both": "all", "Türkçe": "tr", "English": "en"}
+
+
+@st.fragment
+@metrics.section("home")
+def render():
+    bundle = load_bundle()
+
+    st.title("🕌 Cave of Thawr - The Migration Story")
+    with metrics.timed("call_seconds", call="st.video"):
+        # The self-hosted player if the video was prepared (python -m cave.video)
+        if not video.player():
+            st.video("https://youtu.be/bCD9-_y84Zk?si=mdeb2lWwKzVIMt5x")
+    st.header("📜 Selected Qur'an Verses about the Hijrah")
+
+    query = st.text_input("🔎 Search the verses (Arabic, Türkçe or English)")
+    locale = st.radio("Translation", tuple(TRANSLATIONS), horizontal=True)
+
+    def copy_button(verse_id):
+        verse = bundle.verses_by_id[verse_id]
+        if st.button(f"📋 Copy {verse.title.replace(',', '')} Arabic"):
+            st.code(verse.arabic)
+        st.markdown("---")
+
+    if query.strip():
+        with metrics.timed("call_seconds", call="verse_search"):
+            verse_ids = search.verse_index().search(query)
+    else:
+        verse_ids = bundle.verses_by_id
+    if not verse_ids:
+        st.info("No verse matches your search.")
+
+    cards.inject_css()
+    cards.card_list(verse_ids, TRANSLATIONS[locale], key="home_verses", footer=copy_button)
+
+    media.image("sevr_cave.jpg", caption="Cave of Thawr - Present Day")
+
+    st.header("Introduction")
+    st.write(bundle.introduction)
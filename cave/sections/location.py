@@ -0,0 +1,87 @@
+"""Location of the Cave: map of Jabal Thawr."""
+
+import pydeck as pdk
+import streamlit as st
+
+from cave import metrics, route, server, tiles
+
+# Map views: (latitude, longitude, zoom). The route's level of detail
+# follows the view's zoom, not how far the visitor zooms in afterwards.
+VIEWS = {
+    "Cave of Thawr": (21.3775, 39.8508, 12),
+    "The whole Hijrah route": (22.95, 39.60, 6.5),
+}
+
+
+@st.fragment
+@metrics.section("location")
+def render():
+    st.title("📍 Location of the Cave")
+
+    cave_location = {"latitude": 21.3775, "longitude": 39.8508}
+    layers = tiles.start_server()
+    hijrah = route.load_route()
+
+    view = st.radio("Show", tuple(VIEWS), horizontal=True)
+    latitude, longitude, zoom = VIEWS[view]
+
+    have_tiles = "imagery" in layers and "terrain" in layers
+    basemap = []
+    if have_tiles and zoom >= tiles.MIN_ZOOM:
+        # Satellite imagery draped over the terrain, both served locally
+        basemap.append(pdk.Layer(
+            'TerrainLayer',
+            elevation_decoder=tiles.TERRARIUM_DECODER,
+            elevation_data=tiles.tile_url("terrain"),
+            texture=tiles.tile_url("imagery"),
+            min_zoom=tiles.MIN_ZOOM,
+            max_zoom=tiles.MAX_ZOOM,
+        ))
+
+    deck = pdk.Deck(
+        # Streamlit's own basemap, matching the theme: the fallback under or
+        # instead of the local tiles (it needs an internet connection)
+        map_style=None,
+        initial_view_state=pdk.ViewState(
+            latitude=latitude,
+            longitude=longitude,
+            zoom=zoom,
+            pitch=40,
+        ),
+        layers=basemap + [
+            pdk.Layer(
+                'PathLayer',
+                data=[{"path": hijrah.path(zoom)}],
+                get_path='path',
+                get_color='[255, 200, 0, 220]',
+                width_min_pixels=3,
+            ),
+            pdk.Layer(
+                'ScatterplotLayer',
+                data=hijrah.stop_rows(),
+                get_position='position',
+                get_color='[255, 255, 255, 220]',
+                radius_min_pixels=4,
+                pickable=True,
+            ),
+            pdk.Layer(
+                'ScatterplotLayer',
+                data=[cave_location],
+                get_position='[longitude, latitude]',
+                get_color='[200, 30, 0, 160]',
+                get_radius=200,
+            ),
+        ],
+        tooltip={"text": "{name}"},
+    )
+    with metrics.timed("call_seconds", call="st.pydeck_chart"):
+        st.pydeck_chart(deck)
+
+    if not have_tiles and tiles.installed() and not server.PUBLIC_URL:
+        st.caption("Offline map tiles are installed but not shown: set `CAVE_SERVER_URL` to the "
+                   "address browsers reach the tile server at.")
+    elif not have_tiles:
+        st.caption("Offline map tiles are not installed. Run `python -m cave.tiles imagery` "
+                   "and `python -m cave.tiles terrain` once to download them.")
+    elif basemap:
+        st.caption("🌍 Drag with the right mouse button (or two fingers) to tilt and rotate the 3D view of Jabal Thawr.")
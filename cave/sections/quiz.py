@@ -0,0 +1,74 @@
+"""Quiz about the Cave of Thawr."""
+
+import streamlit as st
+
+from cave import metrics, quiz, submissions
+from cave.content import load_bundle
+
+
+@st.fragment
+@metrics.section("quiz")
+def render():
+    bundle = load_bundle()
+    bank, picks, answers = quiz.session_quiz(bundle.quiz_size)
+
+    st.title("🧠 Test Your Knowledge About the Cave of Thawr")
+
+    st.markdown("Answer all questions, then click the 'Submit Quiz' button to see your score!")
+
+    questions = [bank.questions[i] for i in picks]
+    for slot, question in enumerate(questions):
+        st.radio(
+            f"{slot + 1}. {question.question}",
+            question.options,
+            index=int(answers[slot]),
+            key=quiz.widget_key(question),
+            on_change=quiz.record_answer,
+            args=(slot, question),
+        )
+
+    name = st.text_input("Your name for the leaderboard (optional)", max_chars=40, key="quiz_name")
+
+    # Submit button
+    if st.button("🚀 Submit Quiz"):
+        with metrics.timed("call_seconds", call="quiz_score"):
+            score, correct = bank.score(picks, answers)
+        submissions.submit(name, st.session_state.quiz_seed, [q.id for q in questions], answers, correct)
+        st.session_state.quiz_submitted = True
+        quiz.save()
+        st.success(f"🎯 You scored {score} out of {len(questions)}!")
+
+        # Optional feedback
+        if score == len(questions):
+            st.balloons()
+            st.success("🏆 Perfect score! You are a true Seerah expert!")
+        elif score >= 0.7 * len(questions):
+            st.success("👏 Great job! You know your history well!")
+        else:
+            st.warning("📚 Keep studying, you're getting there!")
+
+        for slot in (~correct).nonzero()[0]:
+            question = questions[slot]
+            st.error(f"❌ {slot + 1}. The correct answer is {question.answer}. {question.explanation}".rstrip())
+
+    if len(bank) > len(questions) and st.button("🔀 New questions"):
+        quiz.new_questions(bundle.quiz_size)
+        st.rerun(scope="fragment")
+
+    with st.expander("🏆 Leaderboard"):
+        board = submissions.leaderboard()
+        if board is None or board.empty:
+            st.write("No named submissions yet. Be the first!")
+        else:
+            st.dataframe(board, hide_index=True, width="stretch")
+
+    with st.expander("📊 Question difficulty"):
+        stats = submissions.question_stats()
+        if stats is None or stats.empty:
+            st.write("No submissions yet.")
+        else:
+            text = {q.id: q.question for q in bank.questions}
+            stats.insert(0, "question", stats.pop("question_id").map(text))
+            st.dataframe(stats.dropna(subset=["question"]), hide_index=True, width="stretch",
+                         column_config={"correct_rate": st.column_config.ProgressColumn(
+                             "answered correctly", format="percent", min_value=0, max_value=1)})
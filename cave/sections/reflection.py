@@ -0,0 +1,13 @@
+"""Reflection."""
+
+import streamlit as st
+
+from cave import metrics
+from cave.content import load_bundle
+
+
+@st.fragment
+@metrics.section("reflection")
+def render():
+    st.title("🧠 Reflection")
+    st.write(load_bundle().reflection)
@@ -0,0 +1,27 @@
+"""Story of the Hijrah, told in four parts."""
+
+import streamlit as st
+
+from cave import media, metrics
+from cave.content import load_bundle
+
+
+@st.fragment
+@metrics.section("story")
+def render():
+    bundle = load_bundle()
+
+    st.title("📖 The Story Unfolds")
+
+    story_part = st.radio(
+        "Choose a part of the story:",
+        bundle.story_titles
+    )
+
+    index = bundle.story_titles.index(story_part)
+    part = bundle.story[index]
+    st.subheader(part.title)
+    st.write(part.text)
+    # The parts are read in order: fetch the next picture while this one is read
+    following = bundle.story[index + 1:index + 2]
+    media.figure(part.image, caption=part.caption, prefetch=[p.image for p in following])
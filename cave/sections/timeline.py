@@ -0,0 +1,46 @@
+"""Hijrah Timeline."""
+
+import streamlit as st
+
+from cave import metrics
+from cave.timeline import load_timeline
+
+# Above this many events in the window, show how many happened when instead
+MAX_EVENTS = 50
+
+
+@st.fragment
+@metrics.section("timeline")
+def render():
+    st.title("🕰️ Hijrah Timeline")
+    timeline = load_timeline()
+
+    filters = {}
+    categories, places = timeline.values("category"), timeline.values("location")
+    if categories or places:
+        left, right = st.columns(2)
+        if categories:
+            filters["category"] = left.multiselect("Categories", categories, placeholder="All")
+        if places:
+            filters["location"] = right.multiselect("Places", places, placeholder="All")
+    view = timeline.where(**filters)
+
+    first, last = timeline.years
+    if first < last:
+        start, end = st.slider("Years (CE)", first, last, (first, last))
+    else:
+        start, end = first, last
+    lo, hi = start, end + 1
+
+    if view.at_most(lo, hi) > MAX_EVENTS:
+        st.caption("Too many events to list: narrow the years or pick categories to see them one by one.")
+        with metrics.timed("call_seconds", call="timeline_histogram"):
+            st.bar_chart(view.histogram(lo, hi))
+        return
+
+    with metrics.timed("call_seconds", call="timeline_window"):
+        text = view.markdown(lo, hi)
+    if text:
+        st.markdown(text)
+    else:
+        st.info("No events in these years.")
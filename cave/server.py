@@ -0,0 +1,155 @@
+"""Local HTTP server for files the browser fetches directly.
+
+Streamlit can only send files through its own media endpoint, which
+neither supports Range requests nor lets us set caching headers. Map
+tiles, images and the skit video are therefore served by this small
+threaded server, started once per process. Modules register a handler for
+a path prefix with ``@route("/tiles/")``.
+
+``CAVE_SERVER_PORT`` picks the port (default 8601; 0 for any free one)
+and ``CAVE_SERVER_URL`` the address browsers use to reach it (default
+``http://localhost:<port>``, which only works for a browser on the same
+machine; images and the video are only served from here when it is set,
+see ``cave.assets`` and ``cave.video``).
+"""
+
+import errno
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import streamlit as st
+
+HOST = os.environ.get("CAVE_SERVER_HOST", "0.0.0.0")
+PORT = int(os.environ.get("CAVE_SERVER_PORT", "8601"))
+PUBLIC_URL = os.environ.get("CAVE_SERVER_URL", "").rstrip("/")
+
+CHUNK = 256 * 1024
+
+_routes = {}  # path prefix -> handler(request, rest of the path)
+
+RANGE = re.compile(r"bytes=(\d*)-(\d*)$")
+
+
+def route(prefix):
+    """Register ``handler(request, rest)`` for paths starting with ``prefix``."""
+    def register(handler):
+        _routes[prefix] = handler
+        return handler
+    return register
+
+
+def url(path):
+    """Browser-facing URL of ``path``; starts the server if needed."""
+    if PUBLIC_URL:
+        return PUBLIC_URL + path
+    return f"http://localhost:{start().server_address[1]}{path}"
+
+
+class Handler(BaseHTTPRequestHandler):
+    head_only = False
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        for prefix, handler in _routes.items():
+            if path.startswith(prefix):
+                handler(self, path[len(prefix):])
+                return
+        self.send_error(404)
+
+    def do_HEAD(self):
+        self.head_only = True
+        self.do_GET()
+
+    def send_bytes(self, data, content_type, cache_control="no-cache", headers=None):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", cache_control)
+        self.send_header("Access-Control-Allow-Origin", "*")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if not self.head_only:
+            self.wfile.write(data)
+
+    def not_modified(self, etag, cache_control):
+        """Answer 304 if the client already has ``etag``; returns whether it did."""
+        if etag not in (tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")):
+            return False
+        self.send_response(304)
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", cache_control)
+        self.end_headers()
+        return True
+
+    def send_file(self, path, content_type, cache_control="no-cache", headers=None, etag=None):
+        """Send a file, honouring a single-range ``Range`` header.
+
+        With ``etag`` (a quoted strong validator), a matching
+        ``If-None-Match`` gets an empty 304 instead.
+        """
+        if etag is not None:
+            if self.not_modified(etag, cache_control):
+                return
+            headers = {**(headers or {}), "ETag": etag}
+        size = path.stat().st_size
+        start, end = 0, size - 1
+        match = RANGE.match(self.headers.get("Range", ""))
+        if match and (match.group(1) or match.group(2)):
+            if match.group(1):
+                start = int(match.group(1))
+                end = min(int(match.group(2) or end), size - 1)
+            else:  # bytes=-N: the last N bytes
+                start = max(0, size - int(match.group(2)))
+            if start > end:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Cache-Control", cache_control)
+        self.send_header("Access-Control-Allow-Origin", "*")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.head_only:
+            return
+        with open(path, "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(CHUNK, remaining))
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                remaining -= len(chunk)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@st.cache_resource(show_spinner=False)
+def start():
+    """Start the server once per process.
+
+    If the port is taken (another worker or edition on this host), any free
+    port is used instead; ``url()`` follows it unless ``CAVE_SERVER_URL``
+    is set.
+    """
+    try:
+        server = ThreadingHTTPServer((HOST, PORT), Handler)
+    except OSError as e:
+        if e.errno != errno.EADDRINUSE:
+            raise
+        server = ThreadingHTTPServer((HOST, 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="cave-server", daemon=True).start()
+    return server
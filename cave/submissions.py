@@ -0,0 +1,376 @@
+"""Quiz submission log and saved quiz progress.
+
+Submissions are kept in a SQLite database in WAL mode. Sessions never touch
+the disk themselves: ``submit()`` only puts the record on a queue, and a
+single background thread writes whatever has queued up in one transaction.
+
+The same transaction updates two small aggregate tables, ``player_stats``
+(the leaderboard) and ``question_stats`` (how often each question is
+answered correctly), so showing them never scans the full log.
+
+Unfinished quizzes are saved the same way, under a random resume token, so
+any worker process sharing the database can pick up a quiz that was
+started on another one (see ``cave.cluster``). A saved quiz records which
+session owns it; a worker gives up its sessions' quizzes when it stops,
+and a session taking over a quiz claims it with a direct conditional
+update, the one write not left to the queue, so that two sessions can
+never both win it. Each edition has its own database.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+
+import streamlit as st
+
+from cave.content import EDITION
+
+DB_PATH = Path(os.environ.get(
+    "CAVE_DB_PATH",
+    Path(__file__).resolve().parent.parent / "data"
+    / ("quiz.sqlite3" if EDITION == "default" else f"quiz.{EDITION}.sqlite3"),
+))
+
+# Most submissions written in one transaction
+BATCH_SIZE = 500
+# How long the writer waits for more submissions before committing a batch
+BATCH_WAIT = 0.2
+# Saved progress not touched for this many seconds is deleted
+PROGRESS_TTL = 7 * 24 * 3600
+
+# Attempts at writing a record when the database is busy or full, and the
+# pause between them
+WRITE_ATTEMPTS = 3
+RETRY_WAIT = 1.0
+
+# This worker process, as recorded in the owner of a saved quiz
+PROCESS = f"{socket.gethostname()}:{os.getpid()}"
+# A quiz owned on another worker that has not been saved for this many
+# seconds is up for grabs (in case that worker died without giving it up)
+OWNER_TTL = 3600
+# How long a session waits for the database to claim a quiz before it
+# gives up and starts a new one
+CLAIM_TIMEOUT = 2
+
+log = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    name TEXT NOT NULL,
+    seed INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    total INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS answers (
+    submission_id INTEGER NOT NULL REFERENCES submissions(id),
+    question_id TEXT NOT NULL,
+    answer INTEGER NOT NULL,
+    correct INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS player_stats (
+    name TEXT PRIMARY KEY,
+    attempts INTEGER NOT NULL,
+    best_score INTEGER NOT NULL,
+    best_total INTEGER NOT NULL,
+    best_pct INTEGER NOT NULL,
+    last_at REAL NOT NULL  -- when the best score was first reached, which breaks ties
+);
+CREATE INDEX IF NOT EXISTS player_stats_best ON player_stats (best_pct DESC, last_at);
+CREATE TABLE IF NOT EXISTS question_stats (
+    question_id TEXT PRIMARY KEY,
+    attempts INTEGER NOT NULL,
+    correct INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS quiz_progress (
+    token TEXT PRIMARY KEY,
+    bank TEXT NOT NULL,
+    seed INTEGER NOT NULL,
+    answers TEXT NOT NULL,
+    submitted INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    owner TEXT NOT NULL DEFAULT ''  -- "<process>/<session id>", or '' once released
+);
+"""
+
+UPSERT_PLAYER = """
+INSERT INTO player_stats (name, attempts, best_score, best_total, best_pct, last_at)
+VALUES (:name, 1, :score, :total, :pct, :created_at)
+ON CONFLICT (name) DO UPDATE SET
+    attempts = attempts + 1,
+    best_score = CASE WHEN excluded.best_pct > best_pct THEN excluded.best_score ELSE best_score END,
+    best_total = CASE WHEN excluded.best_pct > best_pct THEN excluded.best_total ELSE best_total END,
+    best_pct = MAX(best_pct, excluded.best_pct),
+    last_at = CASE WHEN excluded.best_pct > best_pct THEN excluded.last_at ELSE last_at END
+"""
+
+UPSERT_QUESTION = """
+INSERT INTO question_stats (question_id, attempts, correct) VALUES (?, 1, ?)
+ON CONFLICT (question_id) DO UPDATE SET
+    attempts = attempts + 1,
+    correct = correct + excluded.correct
+"""
+
+UPSERT_PROGRESS = """
+INSERT INTO quiz_progress (token, bank, seed, answers, submitted, updated_at, owner)
+VALUES (:token, :bank, :seed, :answers, :submitted, :updated_at, :owner)
+ON CONFLICT (token) DO UPDATE SET
+    bank = excluded.bank,
+    seed = excluded.seed,
+    answers = excluded.answers,
+    submitted = excluded.submitted,
+    updated_at = excluded.updated_at,
+    owner = excluded.owner
+WHERE owner IN ('', excluded.owner)
+"""
+
+
+def connect(path=DB_PATH):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(quiz_progress)")}
+    if "owner" not in columns:  # database from before saved quizzes had an owner
+        try:
+            conn.execute("ALTER TABLE quiz_progress ADD COLUMN owner TEXT NOT NULL DEFAULT ''")
+        except sqlite3.OperationalError:  # another worker added it first
+            pass
+    return conn
+
+
+class SubmissionWriter(threading.Thread):
+    """Background thread that owns the only write connection."""
+
+    _STOP = object()
+
+    def __init__(self, path=DB_PATH):
+        super().__init__(name="quiz-submission-writer", daemon=True)
+        self.path = path
+        self.queue = queue.Queue()
+        # token -> (owner, time of the last save) of the unsubmitted quizzes
+        # saved by this process in the last OWNER_TTL seconds
+        self.owned = {}
+
+    def submit(self, record):
+        self.queue.put((_write_submission, record))
+
+    def save_progress(self, record):
+        if record["submitted"]:
+            self.owned.pop(record["token"], None)
+        else:
+            self.owned[record["token"]] = (record["owner"], record["updated_at"])
+        self.queue.put((_write_progress, record))
+
+    def close(self):
+        """Write everything still queued, then stop the thread."""
+        self.queue.put(self._STOP)
+        self.join()
+
+    def run(self):
+        conn = None
+        stopping = False
+        while not stopping:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + BATCH_WAIT
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(self.queue.get(timeout=max(0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            if self._STOP in batch:
+                stopping = True
+                batch = [r for r in batch if r is not self._STOP]
+            if batch:
+                if conn is None:
+                    conn = self._open()
+                if conn is None:
+                    log.error("quiz database unavailable; %d records dropped", len(batch))
+                else:
+                    self._write(conn, batch)
+            # Older quizzes are free to take over anyway
+            cutoff = time.time() - OWNER_TTL
+            for token, (_, saved_at) in self.owned.copy().items():
+                if saved_at < cutoff:
+                    self.owned.pop(token, None)
+        if conn is None:
+            return
+        # Let sessions that reconnect to another worker take their quizzes over
+        released = [(token, owner) for token, (owner, _) in self.owned.copy().items()]
+        self._write(conn, [(_release_progress, released)])
+        conn.close()
+
+    def _open(self):
+        try:
+            conn = connect(self.path)
+            with conn:
+                conn.execute("DELETE FROM quiz_progress WHERE updated_at < ?", (time.time() - PROGRESS_TTL,))
+        except (OSError, sqlite3.Error):
+            log.exception("cannot open the quiz database %s", self.path)
+            return None
+        return conn
+
+    def _write(self, conn, batch):
+        """Write ``batch`` in one transaction, or record by record if that fails.
+
+        A record that still fails after ``WRITE_ATTEMPTS`` is logged and
+        dropped, so the thread keeps serving the queue.
+        """
+        try:
+            with conn:
+                for write, record in batch:
+                    write(conn, record)
+            return
+        except Exception:
+            if len(batch) > 1:
+                log.warning("writing a batch of %d quiz records failed; writing them one by one",
+                            len(batch), exc_info=True)
+        for write, record in batch:
+            for attempt in range(1, WRITE_ATTEMPTS + 1):
+                try:
+                    with conn:
+                        write(conn, record)
+                    break
+                except sqlite3.OperationalError:  # locked, busy or full: may pass
+                    if attempt == WRITE_ATTEMPTS:
+                        log.exception("dropping a quiz record after %d attempts", attempt)
+                    else:
+                        time.sleep(RETRY_WAIT)
+                except Exception:
+                    log.exception("dropping a quiz record that cannot be written")
+                    break
+
+
+def _write_submission(conn, record):
+    cur = conn.execute(
+        "INSERT INTO submissions (created_at, name, seed, score, total) "
+        "VALUES (:created_at, :name, :seed, :score, :total)",
+        record,
+    )
+    rows = [
+        (cur.lastrowid, qid, answer, correct)
+        for qid, answer, correct in zip(record["question_ids"], record["answers"], record["correct"])
+    ]
+    conn.executemany("INSERT INTO answers VALUES (?, ?, ?, ?)", rows)
+    if record["name"]:
+        conn.execute(UPSERT_PLAYER, {**record, "pct": 100 * record["score"] // record["total"]})
+    conn.executemany(UPSERT_QUESTION, [(qid, correct) for _, qid, _, correct in rows])
+
+
+def _write_progress(conn, record):
+    conn.execute(UPSERT_PROGRESS, record)
+
+
+def _release_progress(conn, owned):
+    conn.executemany("UPDATE quiz_progress SET owner = '' WHERE token = ? AND owner = ?", owned)
+
+
+@st.cache_resource(show_spinner=False)
+def get_writer():
+    writer = SubmissionWriter()
+    writer.start()
+    atexit.register(writer.close)
+    return writer
+
+
+def submit(name, seed, question_ids, answers, correct):
+    """Queue a scored submission; returns immediately."""
+    get_writer().submit({
+        "created_at": time.time(),
+        "name": name.strip()[:40],
+        "seed": int(seed),
+        "score": int(correct.sum()),
+        "total": len(question_ids),
+        "question_ids": list(question_ids),
+        "answers": [int(a) for a in answers],
+        "correct": [int(c) for c in correct],
+    })
+
+
+def save_progress(token, owner, bank, seed, answers, submitted=False):
+    """Queue the current state of ``owner``'s quiz; returns immediately.
+
+    Ignored once another session has claimed the quiz.
+    """
+    get_writer().save_progress({
+        "token": token,
+        "bank": bank,
+        "seed": int(seed),
+        "answers": json.dumps([int(a) for a in answers]),
+        "submitted": int(submitted),
+        "updated_at": time.time(),
+        "owner": owner,
+    })
+
+
+def load_progress(token):
+    """Saved progress for ``token`` as a dict, or None."""
+    if not DB_PATH.exists():
+        return None
+    try:
+        with closing(sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True)) as conn:
+            row = conn.execute(
+                "SELECT bank, seed, answers, submitted, updated_at, owner FROM quiz_progress WHERE token = ?",
+                (token,),
+            ).fetchone()
+    except sqlite3.OperationalError:  # database from before progress was saved
+        return None
+    if row is None:
+        return None
+    return {"bank": row[0], "seed": row[1], "answers": json.loads(row[2]), "submitted": bool(row[3]),
+            "updated_at": row[4], "owner": row[5]}
+
+
+def claim_progress(token, previous, owner):
+    """Make ``owner`` the owner of the quiz saved under ``token``.
+
+    Only succeeds if its owner is still ``previous``, so of two sessions
+    claiming the same quiz exactly one wins.
+    """
+    try:
+        with closing(sqlite3.connect(DB_PATH, timeout=CLAIM_TIMEOUT)) as conn, conn:
+            cur = conn.execute("UPDATE quiz_progress SET owner = ? WHERE token = ? AND owner = ?",
+                               (owner, token, previous))
+            return cur.rowcount == 1
+    except sqlite3.OperationalError:  # busy for too long, or no such table
+        return False
+
+
+def _read(query, params=()):
+    import pandas as pd
+
+    if not DB_PATH.exists():
+        return None
+    try:
+        with closing(sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True)) as conn:
+            return pd.read_sql_query(query, conn, params=params)
+    except pd.errors.DatabaseError:  # the writer has not created the tables yet
+        return None
+
+
+@st.cache_data(ttl=10, show_spinner=False)
+def leaderboard(limit=10):
+    return _read(
+        "SELECT name, best_score AS score, best_total AS total, attempts "
+        "FROM player_stats ORDER BY best_pct DESC, last_at LIMIT ?",
+        (limit,),
+    )
+
+
+@st.cache_data(ttl=10, show_spinner=False)
+def question_stats():
+    """Attempts and share answered correctly, hardest question first."""
+    return _read(
+        "SELECT question_id, attempts, 1.0 * correct / attempts AS correct_rate "
+        "FROM question_stats ORDER BY correct_rate, attempts DESC"
+    )
@@ -0,0 +1,215 @@
+"""Offline map tiles for the Location section.
+
+Tiles for the area around Mecca and Jabal Thawr, and coarser ones for the
+whole route to Medina, are kept in MBTiles files (one SQLite file per
+layer) under ``data/tiles``:
+
+* ``imagery.mbtiles`` - satellite imagery
+* ``terrain.mbtiles`` - Terrarium-encoded elevation for the 3D relief
+
+The local server (``cave.server``) serves them at
+``/tiles/<layer>/<z>/<x>/<y>``, once ``CAVE_SERVER_URL`` says where
+browsers reach it. Lookups go through the MBTiles primary key
+index and SQLite's memory-mapped I/O, so serving a tile is one indexed read.
+
+Download the tiles once, while online::
+
+    python -m cave.tiles imagery
+    python -m cave.tiles terrain
+
+Running these again only fetches the tiles that are missing.
+"""
+
+import argparse
+import math
+import sqlite3
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+import streamlit as st
+
+from cave import server
+
+TILES_DIR = Path(__file__).resolve().parent.parent / "data" / "tiles"
+
+# Mecca and Jabal Thawr: west, south, east, north
+BBOX = (39.70, 21.30, 40.00, 21.50)
+# Mecca to Medina, for the view of the whole route
+ROUTE_BBOX = (38.80, 21.20, 40.20, 24.70)
+MIN_ZOOM = 5
+DETAIL_ZOOM = 8
+MAX_ZOOM = 15
+
+# (bbox, zoom levels) downloaded: a dozen coarse tiles for the route, and
+# the detail around the cave
+AREAS = (
+    (ROUTE_BBOX, range(MIN_ZOOM, DETAIL_ZOOM)),
+    (BBOX, range(DETAIL_ZOOM, MAX_ZOOM + 1)),
+)
+
+SOURCES = {
+    "imagery": "https://server.arcgisonline.com/ArcGIS/rest/services/World_Imagery/MapServer/tile/{z}/{y}/{x}",
+    "terrain": "https://s3.amazonaws.com/elevation-tiles-prod/terrarium/{z}/{x}/{y}.png",
+}
+
+# How deck.gl turns a Terrarium pixel into metres
+TERRARIUM_DECODER = {"rScaler": 256, "gScaler": 1, "bScaler": 1 / 256, "offset": -32768}
+
+CONTENT_TYPES = {"png": "image/png", "jpg": "image/jpeg", "jpeg": "image/jpeg", "webp": "image/webp"}
+
+
+class TileStore:
+    """Read-only access to one MBTiles file, safe to share between threads."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        # The server runs every request on a new thread, so they all share
+        # one connection (and its memory map); a lookup takes microseconds
+        self._conn = sqlite3.connect(f"file:{self.path}?mode=ro&immutable=1", uri=True, check_same_thread=False)
+        self._conn.execute("PRAGMA mmap_size=268435456")
+        self._lock = threading.Lock()
+        self.format = self.metadata().get("format", "png")
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def metadata(self):
+        return dict(self._query("SELECT name, value FROM metadata"))
+
+    def get(self, z, x, y):
+        """Tile bytes for XYZ coordinates, or None."""
+        rows = self._query(
+            "SELECT tile_data FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+            (z, x, (1 << z) - 1 - y),  # MBTiles rows count from the bottom (TMS)
+        )
+        return rows[0][0] if rows else None
+
+
+def installed():
+    """Whether both layers the map needs have been downloaded."""
+    return all((TILES_DIR / f"{layer}.mbtiles").exists() for layer in SOURCES)
+
+
+def open_stores():
+    """``{layer: TileStore}`` for every MBTiles file present."""
+    return {path.stem: TileStore(path) for path in sorted(TILES_DIR.glob("*.mbtiles"))}
+
+
+_stores = {}
+
+
+@server.route("/tiles/")
+def serve_tile(request, rest):
+    parts = rest.split("/")
+    store = _stores.get(parts[0])
+    if len(parts) != 4 or store is None:
+        request.send_error(404)
+        return
+    try:
+        z, x, y = int(parts[1]), int(parts[2]), int(parts[3].split(".")[0])
+    except ValueError:
+        request.send_error(404)
+        return
+    data = store.get(z, x, y)
+    if data is None:
+        request.send_error(404)
+        return
+    request.send_bytes(data, CONTENT_TYPES.get(store.format, "application/octet-stream"),
+                       cache_control="public, max-age=604800")
+
+
+@st.cache_resource(show_spinner=False)
+def start_server():
+    """Serve the MBTiles files once per process; returns the layers served.
+
+    Without ``CAVE_SERVER_URL`` nothing is served: the map would send
+    visitors' browsers to their own localhost.
+    """
+    if not server.PUBLIC_URL:
+        return {}
+    _stores.update(open_stores())
+    if _stores:
+        server.start()
+    return dict(_stores)
+
+
+def tile_url(layer):
+    """URL template of a layer, for pydeck."""
+    return server.url(f"/tiles/{layer}/{{z}}/{{x}}/{{y}}")
+
+
+# -------------------- building the MBTiles files ----------------------
+
+def tile_range(bbox, z):
+    """XYZ columns and rows covering ``bbox`` at zoom ``z``."""
+    west, south, east, north = bbox
+    n = 1 << z
+
+    def col(lon):
+        return int((lon + 180) / 360 * n)
+
+    def row(lat):
+        lat = math.radians(lat)
+        return int((1 - math.asinh(math.tan(lat)) / math.pi) / 2 * n)
+
+    return range(col(west), col(east) + 1), range(row(north), row(south) + 1)
+
+
+def build(layer, url, areas=AREAS):
+    TILES_DIR.mkdir(parents=True, exist_ok=True)
+    path = TILES_DIR / f"{layer}.mbtiles"
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE IF NOT EXISTS tiles (
+            zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_data BLOB,
+            PRIMARY KEY (zoom_level, tile_column, tile_row)
+        );
+    """)
+    fmt = "png" if url.endswith(".png") else "jpg"
+    wests, souths, easts, norths = zip(*(bbox for bbox, zooms in areas if zooms))
+    zooms = [z for _, area_zooms in areas for z in area_zooms]
+    conn.executemany("INSERT OR REPLACE INTO metadata VALUES (?, ?)", [
+        ("name", layer), ("format", fmt),
+        ("bounds", ",".join(map(str, (min(wests), min(souths), max(easts), max(norths))))),
+        ("minzoom", str(min(zooms))), ("maxzoom", str(max(zooms))),
+    ])
+
+    for bbox, area_zooms in areas:
+        for z in area_zooms:
+            cols, rows = tile_range(bbox, z)
+            for x in cols:
+                for y in rows:
+                    tms_y = (1 << z) - 1 - y
+                    if conn.execute("SELECT 1 FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+                                    (z, x, tms_y)).fetchone():
+                        continue  # already downloaded
+                    request = urllib.request.Request(url.format(z=z, x=x, y=y),
+                                                     headers={"User-Agent": "cave-of-thawr"})
+                    with urllib.request.urlopen(request, timeout=30) as response:
+                        data = response.read()
+                    conn.execute("INSERT INTO tiles VALUES (?, ?, ?, ?)", (z, x, tms_y, data))
+                    time.sleep(0.05)  # be polite to the tile server
+            conn.commit()
+            print(f"{layer}: zoom {z} done ({len(cols) * len(rows)} tiles)")
+    conn.execute("VACUUM")
+    conn.close()
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download map tiles for offline use.")
+    parser.add_argument("layer", choices=sorted(SOURCES))
+    parser.add_argument("--url", help="tile URL template with {z}/{x}/{y} (default: a public source)")
+    parser.add_argument("--min-zoom", type=int, default=MIN_ZOOM)
+    parser.add_argument("--max-zoom", type=int, default=MAX_ZOOM)
+    args = parser.parse_args()
+    areas = [(bbox, [z for z in zooms if args.min_zoom <= z <= args.max_zoom]) for bbox, zooms in AREAS]
+    build(args.layer, args.url or SOURCES[args.layer], areas)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Timeline engine behind the Hijrah Timeline section.
+
+Every event is an interval ``[start, end)`` in fractional years CE: an
+event known to the month lasts that month, one known to the year lasts
+the year, and events with an ``end_year`` last until the end of it.
+
+The events are kept in a pandas frame sorted by start, with two sorted
+NumPy arrays beside it:
+
+* ``starts`` - the start of each event
+* ``reach`` - the running maximum of the ends, i.e. how far any event up
+  to this one lasts
+
+The events overlapping a window ``[lo, hi)`` are then the rows between
+the first one whose reach passes ``lo`` and the last one starting before
+``hi``: two binary searches, whatever the size of the timeline. Counting
+the events that start in each bucket of a zoomed-out view is one binary
+search per bucket edge, without touching the events at all. Filtering by
+category or place uses a sub-timeline built once per filter.
+"""
+
+import calendar
+import math
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from cave.content import load_bundle
+
+# Bucket widths for zoomed-out views, in years: a month up to a decade
+BUCKET_WIDTHS = (1 / 12, 1 / 4, 1, 5, 10)
+MAX_BUCKETS = 30
+
+# Sub-timelines kept per timeline before the oldest ones are dropped
+MAX_SUBSETS = 64
+
+
+def label(event):
+    """When an event happened, for display: ``Sep 622 CE``, ``610-613 CE``."""
+    def when(year, month):
+        return f"{calendar.month_abbr[month]} {year}" if month else str(year)
+
+    start = when(event.year, event.month)
+    if event.end_year and (event.end_year, event.end_month) != (event.year, event.month):
+        return f"{start}-{when(event.end_year, event.end_month)} CE"
+    return f"{start} CE"
+
+
+def interval(event):
+    """``(start, end)`` of an event in fractional years."""
+    start = event.year + (event.month - 1) / 12 if event.month else event.year
+    if event.end_year:
+        end = event.end_year + event.end_month / 12 if event.end_month else event.end_year + 1
+    else:
+        end = start + (1 / 12 if event.month else 1)
+    return start, end
+
+
+def bucket_width(span):
+    for width in BUCKET_WIDTHS:
+        if span / width <= MAX_BUCKETS:
+            return width
+    return BUCKET_WIDTHS[-1]
+
+
+def bucket_label(start, width):
+    year = math.floor(start + 1e-9)
+    if width >= 1:
+        return str(year)
+    return f"{year}-{round((start - year) * 12) + 1:02d}"
+
+
+class Timeline:
+    def __init__(self, frame):
+        self.frame = frame.sort_values("start", kind="stable").reset_index(drop=True)
+        self.starts = self.frame["start"].to_numpy()
+        self.ends = self.frame["end"].to_numpy()
+        self.reach = np.maximum.accumulate(self.ends) if len(self) else self.ends
+        self._subsets = {}
+
+    @classmethod
+    def from_events(cls, events):
+        rows = []
+        for event in events:
+            start, end = interval(event)
+            place = f" _({event.location})_" if event.location else ""
+            rows.append({
+                "start": start,
+                "end": end,
+                "category": event.category,
+                "location": event.location,
+                "line": f"- **{label(event)}** - {event.event}{place}",
+            })
+        return cls(pd.DataFrame(rows, columns=["start", "end", "category", "location", "line"]))
+
+    def __len__(self):
+        return len(self.frame)
+
+    @property
+    def years(self):
+        """First and last year covered, for the year slider."""
+        if not len(self):
+            return 0, 0
+        return math.floor(self.starts[0]), math.ceil(self.reach[-1]) - 1
+
+    def values(self, column):
+        """Distinct non-empty values of ``column``, sorted."""
+        return sorted(v for v in self.frame[column].unique() if v)
+
+    def where(self, **filters):
+        """The sub-timeline of events whose ``column`` is one of ``values``."""
+        key = tuple(sorted((column, tuple(sorted(values))) for column, values in filters.items() if values))
+        if not key:
+            return self
+        subset = self._subsets.get(key)
+        if subset is None:
+            mask = np.ones(len(self), dtype=bool)
+            for column, values in key:
+                mask &= self.frame[column].isin(values).to_numpy()
+            if len(self._subsets) >= MAX_SUBSETS:
+                self._subsets.clear()
+            subset = self._subsets[key] = Timeline(self.frame[mask])
+        return subset
+
+    def _bounds(self, lo, hi):
+        first = np.searchsorted(self.reach, lo, side="right")
+        last = np.searchsorted(self.starts, hi, side="left")
+        return first, max(first, last)
+
+    def at_most(self, lo, hi):
+        """Upper bound on the number of events overlapping ``[lo, hi)``."""
+        first, last = self._bounds(lo, hi)
+        return int(last - first)
+
+    def window(self, lo, hi):
+        """The events overlapping ``[lo, hi)``, in order."""
+        first, last = self._bounds(lo, hi)
+        rows = self.frame.iloc[first:last]
+        return rows[rows["end"] > lo]
+
+    def markdown(self, lo, hi):
+        return "\n".join(self.window(lo, hi)["line"])
+
+    def counts(self, edges):
+        """Number of events starting in each bucket between ``edges``."""
+        return np.diff(np.searchsorted(self.starts, edges, side="left"))
+
+    def histogram(self, lo, hi, by="category"):
+        """Events starting per bucket of ``[lo, hi)``, one column per ``by`` value."""
+        width = bucket_width(hi - lo)
+        edges = lo + width * np.arange(math.ceil((hi - lo) / width - 1e-9) + 1)
+        columns = {}
+        for value in sorted(self.frame[by].unique()):
+            columns[value or "Other"] = self.where(**{by: (value,)}).counts(edges)
+        index = pd.Index([bucket_label(e, width) for e in edges[:-1]], name="from")
+        return pd.DataFrame(columns, index=index)
+
+
+@st.cache_resource(show_spinner=False)
+def load_timeline():
+    return Timeline.from_events(load_bundle().timeline)
@@ -0,0 +1,164 @@
+"""The skit video, served from this machine.
+
+``python -m cave.video skit.mp4`` uses ffmpeg to write, under
+``data/video``:
+
+* ``poster.webp`` - a small still shown until the visitor presses play
+* ``<height>p.mp4`` - progressive renditions (``faststart``, so playback
+  can begin after the first Range request)
+* ``hls/`` - the same renditions cut into 6 second HLS segments, plus
+  ``master.m3u8`` listing them by bandwidth
+
+The local server (``cave.server``) serves these files with Range support.
+The player uses ``preload="none"``, so nothing but the poster is
+downloaded before the visitor clicks play. Browsers with native HLS
+(Safari, iOS, Android) adapt between renditions; the others get the MP4
+that suits their screen.
+
+Like the asset store, the player is only used when ``CAVE_SERVER_URL``
+says where browsers reach the server; otherwise the page embeds the video
+from YouTube.
+"""
+
+import argparse
+import json
+import shutil
+import subprocess
+from pathlib import Path
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+from cave import server
+
+VIDEO_DIR = Path(__file__).resolve().parent.parent / "data" / "video"
+MANIFEST = VIDEO_DIR / "manifest.json"
+
+# (height, video kbit/s)
+RENDITIONS = ((360, 700), (720, 2500))
+AUDIO_KBPS = 96
+SEGMENT_SECONDS = 6
+POSTER_WIDTH = 960
+
+CONTENT_TYPES = {
+    ".mp4": "video/mp4",
+    ".m3u8": "application/vnd.apple.mpegurl",
+    ".ts": "video/mp2t",
+    ".webp": "image/webp",
+}
+
+PLAYER = """
+<video id="skit" controls playsinline preload="none" poster="{poster}" style="width:100%;border-radius:8px">
+  <source src="{master}" type="application/vnd.apple.mpegurl">
+</video>
+<script>
+  const video = document.getElementById("skit");
+  if (!video.canPlayType("application/vnd.apple.mpegurl")) {{
+    const renditions = {mp4s};
+    const width = window.innerWidth * (window.devicePixelRatio || 1);
+    const saveData = navigator.connection && navigator.connection.saveData;
+    let pick = renditions[0];
+    for (const r of renditions) {{
+      if (!saveData && r.width <= width) pick = r;
+    }}
+    video.src = pick.url;
+  }}
+</script>
+"""
+
+
+@server.route("/video/")
+def serve_video(request, rest):
+    path = (VIDEO_DIR / rest).resolve()
+    if VIDEO_DIR.resolve() not in path.parents or not path.is_file() or path.suffix not in CONTENT_TYPES:
+        request.send_error(404)
+        return
+    request.send_file(path, CONTENT_TYPES[path.suffix], cache_control="public, max-age=86400")
+
+
+@st.cache_resource(show_spinner=False)
+def load_manifest():
+    """The transcoded renditions, or None if the video was not prepared."""
+    if not MANIFEST.exists():
+        return None
+    server.start()
+    return json.loads(MANIFEST.read_text())
+
+
+def player(height=480):
+    """Show the self-hosted player; returns False if it can't be used.
+
+    That is without a prepared video, or without ``CAVE_SERVER_URL``.
+    """
+    if not server.PUBLIC_URL:
+        return False
+    manifest = load_manifest()
+    if manifest is None:
+        return False
+    mp4s = [{"width": r["width"], "url": server.url(f"/video/{r['mp4']}")} for r in manifest["renditions"]]
+    components.html(PLAYER.format(
+        poster=server.url(f"/video/{manifest['poster']}"),
+        master=server.url("/video/hls/master.m3u8"),
+        mp4s=json.dumps(mp4s),
+    ), height=height)
+    return True
+
+
+# -------------------- transcoding ----------------------
+
+def ffmpeg(*args):
+    subprocess.run(["ffmpeg", "-hide_banner", "-loglevel", "error", "-y", *args], check=True)
+
+
+def transcode(source):
+    from PIL import Image
+
+    if shutil.which("ffmpeg") is None:
+        raise SystemExit("ffmpeg is needed to prepare the video")
+    (VIDEO_DIR / "hls").mkdir(parents=True, exist_ok=True)
+
+    frame = VIDEO_DIR / "poster.png"
+    ffmpeg("-ss", "3", "-i", str(source), "-frames:v", "1", str(frame))
+    with Image.open(frame) as im:
+        im.thumbnail((POSTER_WIDTH, POSTER_WIDTH))
+        im.convert("RGB").save(VIDEO_DIR / "poster.webp", "WEBP", quality=70)
+    frame.unlink()
+
+    renditions = []
+    for height, kbps in RENDITIONS:
+        mp4 = f"{height}p.mp4"
+        ffmpeg("-i", str(source), "-vf", f"scale=-2:{height}",
+               "-c:v", "libx264", "-preset", "slow", "-profile:v", "main",
+               "-b:v", f"{kbps}k", "-maxrate", f"{kbps * 3 // 2}k", "-bufsize", f"{kbps * 2}k",
+               # A keyframe every segment, so HLS segments can be cut cleanly
+               "-force_key_frames", f"expr:gte(t,n_forced*{SEGMENT_SECONDS})",
+               "-c:a", "aac", "-b:a", f"{AUDIO_KBPS}k", "-movflags", "+faststart", str(VIDEO_DIR / mp4))
+        ffmpeg("-i", str(VIDEO_DIR / mp4), "-c", "copy", "-f", "hls",
+               "-hls_time", str(SEGMENT_SECONDS), "-hls_playlist_type", "vod",
+               "-hls_segment_filename", str(VIDEO_DIR / "hls" / f"{height}p_%03d.ts"),
+               str(VIDEO_DIR / "hls" / f"{height}p.m3u8"))
+        probe = subprocess.run(
+            ["ffprobe", "-v", "error", "-select_streams", "v:0", "-show_entries", "stream=width",
+             "-of", "csv=p=0", str(VIDEO_DIR / mp4)],
+            check=True, capture_output=True, text=True,
+        )
+        renditions.append({"height": height, "width": int(probe.stdout.strip()),
+                           "bandwidth": (kbps + AUDIO_KBPS) * 1000, "mp4": mp4})
+
+    lines = ["#EXTM3U", "#EXT-X-VERSION:3"]
+    for r in renditions:
+        lines.append(f"#EXT-X-STREAM-INF:BANDWIDTH={r['bandwidth']},RESOLUTION={r['width']}x{r['height']}")
+        lines.append(f"{r['height']}p.m3u8")
+    (VIDEO_DIR / "hls" / "master.m3u8").write_text("\n".join(lines) + "\n")
+    MANIFEST.write_text(json.dumps({"poster": "poster.webp", "renditions": renditions}, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prepare the skit video for local streaming.")
+    parser.add_argument("source", type=Path, help="the original video file")
+    transcode(parser.parse_args().source)
+    print(f"video written to {VIDEO_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Warm-up of the shared caches, so the first visitors don't pay for them.
+
+``start()`` is called at the top of the app. On the first script run in a
+process it starts a background thread that fills the ``st.cache_resource``
+caches every session shares: the compiled content bundle, the verse
+cards, Arabic font and search index, the image variants (and their place
+in the asset store or their bytes) and the story placeholders. The first
+session carries on rendering meanwhile; if it needs something that is
+still being built, it waits for that one entry rather than building it
+twice. The route is left to the Location section, because loading it
+imports NumPy, which no other page needs and which would compete with
+the first render.
+
+The files behind those caches and the route's levels of detail (image
+variants and placeholders, font subset, route, asset store) can also be
+built at deploy time, before any worker starts::
+
+    python -m cave.warmup
+"""
+
+import threading
+
+import streamlit as st
+
+from cave import cards, fonts, media, metrics, search
+from cave.content import load_bundle
+
+# Images shown outside the story, with the slot they are shown in
+IMAGES = (
+    ("video_qr.png", "sidebar"),
+    ("group_photo.jpg", "sidebar"),
+    ("sevr_cave.jpg", "main"),
+)
+
+
+def preload():
+    """Fill the shared caches of this process."""
+    with metrics.timed("call_seconds", call="warm_up"):
+        bundle = load_bundle()
+        for verse in bundle.verses:
+            for locale in cards.LOCALES:
+                cards.card_html(verse.id, locale)
+        search.verse_index()
+        fonts.font_face()
+        for name, slot in IMAGES + tuple((part.image, "main") for part in bundle.story):
+            media.source(name, slot)
+        for part in bundle.story:
+            media.placeholder(part.image)
+
+
+@st.cache_resource(show_spinner=False)
+def start():
+    """Start warming up, once per process."""
+    thread = threading.Thread(target=preload, name="cave-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def main():
+    preload()
+    from cave import route
+    route.load_route()
+    print("caches built")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import copy
+
+import pytest
+
+from cave.content import BundleError, compile_bundle
+
+RAW = {
+    "version": 1,
+    "verses": [{"id": "9:40", "title": "Tawbah 9:40", "arabic": "...", "tr": "...", "en": "..."}],
+    "introduction": "Intro",
+    "story": [{"title": "Part", "text": "Text", "image": "cave.jpg", "caption": "Caption"}],
+    "timeline": [{"year": 622, "month": 9, "event": "Hijrah"}],
+    "quiz_size": 1,
+    "quiz": [{"id": "q1", "question": "Where?", "options": ["Thawr", "Hira"], "answer": "Thawr"}],
+    "reflection": "Reflection",
+}
+
+
+def broken(change):
+    raw = copy.deepcopy(RAW)
+    change(raw)
+    with pytest.raises(BundleError) as info:
+        compile_bundle(raw)
+    return str(info.value)
+
+
+def test_compile():
+    bundle = compile_bundle(RAW)
+    assert bundle.verses_by_id["9:40"].title == "Tawbah 9:40"
+    assert bundle.quiz[0].options == ("Thawr", "Hira")
+    assert bundle.timeline[0].end_year == 0  # optional field keeps its default
+
+
+def test_validation():
+    assert broken(lambda raw: raw.pop("reflection")) == "bundle: missing 'reflection'"
+    assert broken(lambda raw: raw["verses"][0].pop("en")) == "verses[0]: missing 'en'"
+    assert "should be int" in broken(lambda raw: raw.update(quiz_size="1"))
+    assert "unknown field" in broken(lambda raw: raw["story"][0].update(colour="red"))
+    assert "unsupported version" in broken(lambda raw: raw.update(version=2))
+    assert "month" in broken(lambda raw: raw["timeline"][0].update(month=13))
+    assert "ends before" in broken(lambda raw: raw["timeline"][0].update(end_year=621))
+    assert "duplicate question" in broken(lambda raw: raw["quiz"].append(raw["quiz"][0]))
+    assert "not one of the options" in broken(lambda raw: raw["quiz"][0].update(answer="Uhud"))
+    assert "quiz_size" in broken(lambda raw: raw.update(quiz_size=2))
+    assert "quiz_size" in broken(lambda raw: raw.update(quiz_size=0))
@@ -0,0 +1,29 @@
+import numpy as np
+
+from cave.content import Question
+from cave.quiz import QuestionBank
+
+
+def bank(n):
+    return QuestionBank(tuple(
+        Question(id=f"q{i}", question=f"Question {i}?", options=("a", "b", "c"), answer="abc"[i % 3])
+        for i in range(n)
+    ))
+
+
+def test_sample():
+    questions = bank(20)
+    picks = questions.sample(5, seed=7)
+    assert len(set(picks)) == 5
+    assert list(picks) == sorted(picks)
+    assert list(picks) == list(questions.sample(5, seed=7))  # same seed, same quiz
+    assert any(list(questions.sample(5, seed=s)) != list(picks) for s in range(8, 12))
+    assert list(questions.sample(50, seed=7)) == list(range(20))  # capped at the bank size
+
+
+def test_score():
+    questions = bank(6)
+    picks = np.array([1, 3, 4])  # answers b, a, b
+    score, correct = questions.score(picks, np.array([1, 2, 1]))
+    assert score == 2
+    assert list(correct) == [True, False, True]
@@ -0,0 +1,15 @@
+import numpy as np
+
+from cave.route import douglas_peucker
+
+
+def test_straight_line():
+    points = np.array([[0, 0], [1, 1], [2, 2], [3, 3]], dtype=float)
+    assert list(douglas_peucker(points, 0.01)) == [0, 3]
+
+
+def test_keeps_corners():
+    points = np.array([[0, 0], [1, 0.001], [2, 0], [2, 1], [2, 2]], dtype=float)
+    assert list(douglas_peucker(points, 0.01)) == [0, 2, 4]
+    assert list(douglas_peucker(points, 0)) == [0, 1, 2, 4]  # (2, 1) lies on the last leg
+    assert list(douglas_peucker(points[:2], 1)) == [0, 1]
@@ -0,0 +1,25 @@
+from cave.search import SearchIndex, normalize
+
+
+def test_arabic_folding():
+    assert normalize("ٱللَّهُ") == normalize("الله")  # alef wasla and harakat
+    assert normalize("إِنَّ") == normalize("ان")  # alef with hamza below
+    assert normalize("قَالَ لِصَـٰحِبِهِۦ") == normalize("قال لصحبه")  # tatweel and Qur'anic marks
+
+
+def test_turkish_folding():
+    assert normalize("kuşattık") == normalize("kusattik")
+    assert normalize("İNKAR ETTİĞİNİZ") == normalize("inkar ettiginiz")
+    assert normalize("IŞIK") == normalize("isik")  # dotless capital I
+
+
+def test_search():
+    index = SearchIndex([
+        ("9:40", "إِلَّا تَنصُرُوهُ فَقَدْ نَصَرَهُ ٱللَّهُ Allah ona yardım etmişti"),
+        ("8:30", "Hani inkâr edenler seni kuşattıklarında, and Allah plans"),
+    ])
+    assert index.search("الله") == ["9:40"]
+    assert index.search("kusattik") == ["8:30"]
+    assert index.search("allah") == ["9:40", "8:30"]
+    assert index.search("nasarahu") == []
+    assert index.search("") == []
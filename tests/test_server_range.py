@@ -0,0 +1,69 @@
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from cave import server
+
+DATA = bytes(range(256)) * 4  # 1024 bytes
+
+
+@pytest.fixture(scope="module")
+def base_url(tmp_path_factory):
+    path = tmp_path_factory.mktemp("server") / "clip.bin"
+    path.write_bytes(DATA)
+
+    @server.route("/test-range/")
+    def serve(request, rest):
+        request.send_file(path, "application/octet-stream")
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), server.Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/test-range/clip.bin"
+    httpd.shutdown()
+    httpd.server_close()
+    server._routes.pop("/test-range/")
+
+
+def get(url, range_header):
+    request = urllib.request.Request(url, headers={"Range": range_header})
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+
+def test_open_ended_range(base_url):
+    status, headers, body = get(base_url, "bytes=1000-")
+    assert status == 206
+    assert headers["Content-Range"] == "bytes 1000-1023/1024"
+    assert body == DATA[1000:]
+
+
+def test_suffix_range(base_url):
+    status, headers, body = get(base_url, "bytes=-100")
+    assert status == 206
+    assert headers["Content-Range"] == "bytes 924-1023/1024"
+    assert body == DATA[-100:]
+
+
+def test_suffix_longer_than_file(base_url):
+    status, headers, body = get(base_url, "bytes=-5000")
+    assert status == 206
+    assert headers["Content-Range"] == "bytes 0-1023/1024"
+    assert body == DATA
+
+
+def test_start_after_end(base_url):
+    status, headers, _ = get(base_url, "bytes=500-100")
+    assert status == 416
+    assert headers["Content-Range"] == "bytes */1024"
+
+
+def test_start_past_end_of_file(base_url):
+    status, headers, _ = get(base_url, "bytes=2000-")
+    assert status == 416
+    assert headers["Content-Range"] == "bytes */1024"
@@ -0,0 +1,65 @@
+import sqlite3
+import time
+
+from cave import submissions
+
+
+def progress(token, owner="p/a", submitted=False):
+    return {"token": token, "bank": "b", "seed": 1, "answers": "[0]", "submitted": int(submitted),
+            "updated_at": time.time(), "owner": owner}
+
+
+def test_writer_survives_a_bad_record(tmp_path):
+    path = tmp_path / "quiz.sqlite3"
+    writer = submissions.SubmissionWriter(path)
+    writer.start()
+    writer.save_progress(progress("good"))
+    writer.save_progress({**progress("bad"), "seed": None})  # violates NOT NULL
+    time.sleep(2 * submissions.BATCH_WAIT)
+    assert writer.is_alive()
+    writer.save_progress(progress("later"))
+    writer.close()
+    with sqlite3.connect(path) as conn:
+        tokens = {row[0] for row in conn.execute("SELECT token FROM quiz_progress")}
+    assert tokens == {"good", "later"}
+
+
+def test_writer_releases_unsubmitted_quizzes(tmp_path):
+    path = tmp_path / "quiz.sqlite3"
+    writer = submissions.SubmissionWriter(path)
+    writer.start()
+    writer.save_progress(progress("open"))
+    writer.save_progress(progress("done"))
+    writer.save_progress(progress("done", submitted=True))
+    assert set(writer.owned) == {"open"}
+    writer.close()
+    with sqlite3.connect(path) as conn:
+        owners = dict(conn.execute("SELECT token, owner FROM quiz_progress"))
+    assert owners == {"open": "", "done": "p/a"}
+
+
+def test_claim_progress(tmp_path, monkeypatch):
+    monkeypatch.setattr(submissions, "DB_PATH", tmp_path / "quiz.sqlite3")
+    writer = submissions.SubmissionWriter(submissions.DB_PATH)
+    writer.start()
+    writer.save_progress(progress("quiz"))
+    writer.close()  # gives the quiz up
+    assert submissions.claim_progress("quiz", "", "p/b")
+    assert not submissions.claim_progress("quiz", "", "p/c")  # p/b won
+    assert submissions.load_progress("quiz")["owner"] == "p/b"
+    assert not submissions.claim_progress("missing", "", "p/b")
+
+
+def test_leaderboard_ties(tmp_path, monkeypatch):
+    monkeypatch.setattr(submissions, "DB_PATH", tmp_path / "quiz.sqlite3")
+    writer = submissions.SubmissionWriter(submissions.DB_PATH)
+    writer.start()
+    for at, name, score in ((1, "Ali", 1), (2, "Zeyd", 1), (3, "Ali", 1), (4, "Hind", 2), (5, "Zeyd", 0)):
+        writer.submit({"created_at": at, "name": name, "seed": 1, "score": score, "total": 2,
+                       "question_ids": ["q1", "q2"], "answers": [0, 0], "correct": [int(n < score) for n in range(2)]})
+    writer.close()
+    submissions.leaderboard.clear()
+    board = submissions.leaderboard()
+    # Equal scores rank by who reached them first; repeating a score does not move you down
+    assert list(board["name"]) == ["Hind", "Ali", "Zeyd"]
+    assert list(board["attempts"]) == [1, 2, 2]
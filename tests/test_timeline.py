@@ -0,0 +1,39 @@
+from cave.content import TimelineEvent
+from cave.timeline import Timeline
+
+
+def events(timeline, lo, hi):
+    return [line.split(" - ")[1] for line in timeline.window(lo, hi)["line"]]
+
+
+def test_overlapping_events():
+    timeline = Timeline.from_events([
+        TimelineEvent(year=620, event="Short"),
+        TimelineEvent(year=600, event="Long", end_year=640),
+        TimelineEvent(year=610, event="Revelation", month=8),
+        TimelineEvent(year=635, event="Later"),
+    ])
+    # "Long" started well before the window but still lasts: found through reach
+    assert events(timeline, 630, 631) == ["Long"]
+    assert events(timeline, 635, 636) == ["Long", "Later"]
+    assert events(timeline, 610, 611) == ["Long", "Revelation"]
+    assert events(timeline, 620, 621) == ["Long", "Short"]
+    assert timeline.at_most(630, 631) >= 1
+
+
+def test_empty_window():
+    timeline = Timeline.from_events([
+        TimelineEvent(year=610, event="First"),
+        TimelineEvent(year=622, event="Hijrah", month=9),
+    ])
+    for lo, hi in ((500, 600), (611, 622), (700, 710)):
+        assert events(timeline, lo, hi) == []
+        assert timeline.markdown(lo, hi) == ""
+    assert timeline.at_most(700, 710) == 0
+
+
+def test_no_events():
+    timeline = Timeline.from_events([])
+    assert timeline.years == (0, 0)
+    assert timeline.window(0, 1000).empty
+    assert timeline.at_most(0, 1000) == 0